@@ -0,0 +1,103 @@
+"""Totais mantidos por diferença entre os reruns do dashboard.
+
+Ao excluir um fornecedor, em vez de filtrar a planilha inteira e refazer os
+groupbys, subtrai-se a linha desse fornecedor dos totais já calculados; ao
+reincluí-lo, soma-se de volta. Com os meses é igual: desmarcar um mês tira a
+coluna dele da soma do período. Cada mudança de filtro custa O(grupos
+afetados), não O(linhas).
+
+Os totais ficam em centavos inteiros (int64): somar e subtrair a mesma linha
+volta exatamente ao valor anterior, sem o resíduo de ponto flutuante que
+apareceria como 'R$ -0,00'. Só o que sai para os gráficos é dividido por 100.
+"""
+import numpy as np
+import pandas as pd
+
+from cubo import meses_do_cubo
+from normalizacao import CENTAVOS_POR_REAL
+
+
+class TotaisIncrementais:
+    """Totais por fornecedor e por mês, atualizados só com o que mudou no filtro."""
+
+    def __init__(self, cubo):
+        por_fornecedor = cubo.groupby(level='FORNECEDOR', sort=False, dropna=False).sum()
+        self.fornecedores = por_fornecedor.index
+        self.colunas = list(por_fornecedor.columns)
+        # O cubo sai em reais, mas veio de somas em centavos: o arredondamento recupera o inteiro exato
+        reais = por_fornecedor.to_numpy(dtype='float64')
+        self.valores = np.rint(np.nan_to_num(reais) * CENTAVOS_POR_REAL).astype(np.int64)
+        self._linha = {f: i for i, f in enumerate(self.fornecedores)}
+        self._coluna = {c: j for j, c in enumerate(self.colunas)}
+        # Linhas sem fornecedor entram nos totais por mês, mas não nos gráficos por fornecedor
+        self._com_nome = self.fornecedores.notna()
+
+        self.todos_meses = meses_do_cubo(cubo)
+        self.ativos = np.ones(len(self.fornecedores), dtype=bool)
+        self.excluidos = set()
+        self.meses = list(self.todos_meses)
+        self._recalcular()
+
+    def _recalcular(self):
+        """Recalcula tudo do zero, na criação."""
+        self.soma = self.valores[self.ativos].sum(axis=0)
+        self.periodo = int(sum(self.soma[self._coluna[m]] for m in self.meses))
+
+    def atualizar_exclusoes(self, fornecedores_excluir):
+        """Aplica a nova lista de fornecedores excluídos como diferença da anterior."""
+        novos = set(fornecedores_excluir)
+        colunas_periodo = [self._coluna[m] for m in self.meses]
+        for fornecedor, sinal in [(f, -1) for f in novos - self.excluidos] + \
+                                 [(f, 1) for f in self.excluidos - novos]:
+            i = self._linha[fornecedor]
+            self.ativos[i] = sinal > 0
+            self.soma += sinal * self.valores[i]
+            self.periodo += sinal * int(self.valores[i, colunas_periodo].sum())
+        self.excluidos = novos
+
+    def atualizar_meses(self, meses):
+        """Aplica a nova seleção de meses como diferença da anterior."""
+        novos = list(meses)
+        for mes in set(self.meses) - set(novos):
+            self.periodo -= int(self.soma[self._coluna[mes]])
+        for mes in set(novos) - set(self.meses):
+            self.periodo += int(self.soma[self._coluna[mes]])
+        self.meses = novos
+
+    @property
+    def total_periodo(self):
+        """Despesa dos fornecedores ativos nos meses selecionados, em reais."""
+        return self.periodo / CENTAVOS_POR_REAL
+
+    def fornecedores_ativos(self):
+        return self.fornecedores[self.ativos & self._com_nome].tolist()
+
+    def total_por_fornecedor(self, coluna='Total'):
+        linhas = self.ativos & self._com_nome
+        return pd.Series(self.valores[linhas, self._coluna[coluna]] / CENTAVOS_POR_REAL,
+                         index=self.fornecedores[linhas], name=coluna)
+
+    def participacao_por_fornecedor(self):
+        fornecedor_total = self.total_por_fornecedor().reset_index()
+        fornecedor_total['%'] = fornecedor_total['Total'] / fornecedor_total['Total'].sum() * 100
+        return fornecedor_total
+
+    def total_por_mes(self, meses=None):
+        meses = self.todos_meses if meses is None else meses
+        return pd.Series(self.soma[[self._coluna[m] for m in meses]] / CENTAVOS_POR_REAL, index=meses)
+
+    def evolucao_fornecedor(self, fornecedor, meses=None):
+        """Despesa do fornecedor em cada mês; zero para um fornecedor que não está no cubo (ou None)."""
+        meses = self.meses if meses is None else meses
+        i = self._linha.get(fornecedor)
+        if i is None:
+            return pd.Series(0.0, index=meses)
+        return pd.Series(self.valores[i, [self._coluna[m] for m in meses]] / CENTAVOS_POR_REAL, index=meses)
+
+    def por_fornecedor_e_mes(self, meses=None):
+        """Despesa de cada fornecedor ativo em cada mês (formato largo)."""
+        meses = self.meses if meses is None else meses
+        linhas = self.ativos & self._com_nome
+        colunas = [self._coluna[m] for m in meses]
+        return pd.DataFrame(self.valores[np.ix_(linhas, colunas)] / CENTAVOS_POR_REAL,
+                            index=self.fornecedores[linhas], columns=meses)
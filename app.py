@@ -1,11 +1,27 @@
+import hashlib
+
 import streamlit as st
 import pandas as pd
 from datetime import datetime
 
+from busca import IndiceBusca
+from exportacao import MIME_XLSX, excel_em_bytes
+
 st.set_page_config(page_title="Tratador de Despesas", layout="centered")
 
 st.title("💼 Tratamento de Planilha de Despesas")
 
+# Os bytes ficam guardados uma vez só (o cache_data guardaria uma cópia e
+# devolveria outra a cada chamada)
+@st.cache_resource(max_entries=4, show_spinner=False)
+def planilha_tratada(estado_filtros, _df):
+    return excel_em_bytes(_df)
+
+# O índice das palavras-chave é montado uma vez por planilha
+@st.cache_resource(max_entries=4, show_spinner=False)
+def indice_de_busca(chave, _df):
+    return IndiceBusca(_df, ['Fornecedor', 'Serviço', 'Descrição'])
+
 # Upload do arquivo
 arquivo = st.file_uploader("📁 Envie sua planilha Excel", type=["xlsx"])
 
@@ -26,34 +42,30 @@ if arquivo:
     data_inicio = st.date_input("Data Início", value=datetime.today())
     data_fim = st.date_input("Data Fim", value=datetime.today())
 
-    st.subheader("🔍 Filtro por palavra-chave (Fornecedor ou Serviço)")
-    palavra = st.text_input("Palavra-chave para excluir (opcional)").lower()
-
-    # Aplicar filtros
-    df_filtrado = df[(df['Vencimento'] >= pd.to_datetime(data_inicio)) & 
-                     (df['Vencimento'] <= pd.to_datetime(data_fim))]
+    st.subheader("🔍 Filtro por palavra-chave (Fornecedor, Serviço ou Descrição)")
+    st.caption("Sem diferenciar acentos e maiúsculas; cada palavra acha também trechos de palavras "
+               "(\"net\" encontra \"internet\"). Separe vários termos por vírgula; as palavras de um "
+               "mesmo termo precisam estar no mesmo campo, em qualquer ordem.")
+    incluir = st.text_input("Palavras-chave para incluir (opcional)")
+    palavra = st.text_input("Palavra-chave para excluir (opcional)")
 
-    if palavra:
-        df_filtrado = df_filtrado[
-            ~df_filtrado['Fornecedor'].str.lower().str.contains(palavra) &
-            ~df_filtrado['Serviço'].str.lower().str.contains(palavra)
-        ]
+    # Aplicar filtros: período pelo pandas, palavras-chave pelo índice de busca
+    chave = hashlib.sha256(arquivo.getvalue()).hexdigest()
+    indice = indice_de_busca(chave, df)
+    mascara = ((df['Vencimento'] >= pd.to_datetime(data_inicio)) &
+               (df['Vencimento'] <= pd.to_datetime(data_fim))).to_numpy()
+    df_filtrado = df[mascara & indice.filtrar(incluir, palavra)]
 
     # Marcar como pago
-    if st.checkbox("✅ Marcar todos como 'Pago'"):
+    marcar_pago = st.checkbox("✅ Marcar todos como 'Pago'")
+    if marcar_pago:
         df_filtrado['Status'] = 'Pago'
 
     st.subheader("📋 Resultado Tratado")
     st.dataframe(df_filtrado)
 
-    # Exportar planilha
-    def to_excel(df):
-        from io import BytesIO
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Tratado')
-        return output.getvalue()
-
-    excel_bytes = to_excel(df_filtrado)
-    st.download_button("📥 Baixar Planilha Tratada", data=excel_bytes,
-                       file_name="Despesas_Tratadas.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    # Exportar planilha: o .xlsx só é montado quando alguém clica em baixar, e
+    # fica em cache para o mesmo arquivo com os mesmos filtros
+    estado_filtros = (chave, data_inicio, data_fim, incluir, palavra, marcar_pago)
+    st.download_button("📥 Baixar Planilha Tratada", data=lambda: planilha_tratada(estado_filtros, df_filtrado),
+                       file_name="Despesas_Tratadas.xlsx", mime=MIME_XLSX)
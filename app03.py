@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta
+
+from vencimentos import proximo_vencimento
 
 st.set_page_config(page_title="Controle de Despesas", layout="wide")
 st.title("📊 Controle de Despesas de TI")
@@ -18,16 +19,9 @@ if arquivo:
     # Converte a coluna 'Vence' para número
     df['Vence'] = pd.to_numeric(df['Vence'], errors='coerce')
 
-    # Cria coluna com data de vencimento
-    hoje = datetime.now()
-    df['Data Vencimento'] = df['Vence'].apply(
-        lambda dia: datetime(hoje.year, hoje.month, int(dia)) if not pd.isna(dia) and 1 <= dia <= 31 else pd.NaT
-    )
-
-    # Ajusta para mês seguinte, se data já passou
-    df['Data Vencimento'] = df['Data Vencimento'].apply(
-        lambda d: d + pd.DateOffset(months=1) if pd.notna(d) and d < hoje else d
-    )
+    # Cria coluna com data de vencimento (o próximo dia 'Vence', a partir de hoje)
+    hoje = pd.Timestamp.now().normalize()
+    df['Data Vencimento'] = proximo_vencimento(df['Vence'], hoje)
 
     # Define cores
     def cor_linha(row):
@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 
+from vencimentos import classificar_vencimentos, mostrar_vencimentos
+
 # Configuração da página
 st.set_page_config(page_title="Despesas de TI", layout="wide")
 
@@ -28,29 +30,9 @@ df['Descrição'] = df['Descrição'].astype(str).str.strip()
 df['Fornecedor'] = df['Fornecedor'].astype(str).str.strip()
 df['Status'] = df['Status'].fillna('')  # Preenche NaN com string vazia
 
-# Função de formatação por vencimento
-def cor_linha(row):
-    try:
-        dia_vencimento = int(row['Vence'])
-    except:
-        return 'background-color: white'
-
-    hoje = pd.Timestamp.now().day
-    if dia_vencimento == hoje:
-        return 'background-color: orange'
-    elif dia_vencimento < hoje:
-        return 'background-color: red; color: white'
-    elif dia_vencimento > hoje:
-        return 'background-color: green; color: white'
-    else:
-        return 'background-color: white'
+# Situação de vencimento de cada linha, calculada de uma vez para a coluna inteira
+situacao = classificar_vencimentos(df['Vence'])
 
 # Exibe a tabela com formatação condicional
 st.subheader("📅 Despesas com Vencimentos")
-st.dataframe(
-    df.style.apply(
-        lambda row: [cor_linha(row)] * len(df.columns),
-        axis=1
-    ),
-    use_container_width=True
-)
+mostrar_vencimentos(df, situacao, use_container_width=True)
@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 
+from vencimentos import classificar_vencimentos, mostrar_vencimentos
+
 st.set_page_config(page_title="Despesas de TI", layout="wide")
 st.title("💼 Controle de Despesas de TI")
 
@@ -19,28 +21,13 @@ else:
     st.error(f"Número inesperado de colunas: {len(df.columns)}. Verifique o arquivo Excel.")
     st.stop()
 
-# Ajusta valores
-df = df.astype(str)
+# Ajusta valores: só o dia de vencimento vira número
+df['Vence'] = pd.to_numeric(df['Vence'], errors='coerce')
 df['Status'] = df['Status'].fillna('')
 
-# Formatação
-def cor_linha(row):
-    try:
-        dia_venc = int(row['Vence'])
-    except:
-        return 'background-color: white'
-
-    hoje = pd.Timestamp.now().day
-    if dia_venc == hoje:
-        return 'background-color: orange'
-    elif dia_venc < hoje:
-        return 'background-color: red; color: white'
-    else:
-        return 'background-color: green; color: white'
+# Situação de vencimento de cada linha, calculada de uma vez para a coluna inteira
+situacao = classificar_vencimentos(df['Vence'])
 
 # Exibe
 st.subheader("📅 Despesas com Vencimentos")
-st.dataframe(
-    df.style.apply(lambda x: [cor_linha(x)] * len(df.columns), axis=1),
-    use_container_width=True
-)
+mostrar_vencimentos(df, situacao, use_container_width=True)
@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 
+from vencimentos import classificar_vencimentos, mostrar_vencimentos
+
 st.set_page_config(page_title="Despesas de TI", layout="wide")
 st.title("💼 Controle de Despesas de TI")
 
@@ -22,25 +24,13 @@ df.columns = colunas_usadas
 # Remove linhas totalmente vazias
 df = df.dropna(how='all')
 
-# Prepara dados
-df = df.astype(str)
+# Prepara dados: só o dia de vencimento vira número; o resto fica como veio
+df['Vence'] = pd.to_numeric(df['Vence'], errors='coerce')
 df['Status'] = df['Status'].fillna('')
 
-# Define estilo de cor para vencimentos
-def cor_linha(row):
-    try:
-        dia_venc = int(row['Vence'])
-    except:
-        return ['background-color: white'] * len(row)
-    
-    hoje = pd.Timestamp.now().day
-    if dia_venc == hoje:
-        return ['background-color: orange'] * len(row)
-    elif dia_venc < hoje:
-        return ['background-color: red; color: white'] * len(row)
-    else:
-        return ['background-color: green; color: white'] * len(row)
+# Situação de vencimento de cada linha, calculada de uma vez para a coluna inteira
+situacao = classificar_vencimentos(df['Vence'])
 
 # Exibe no app
 st.subheader("📅 Despesas com Vencimentos")
-st.dataframe(df.style.apply(cor_linha, axis=1), use_container_width=True)
+mostrar_vencimentos(df, situacao, use_container_width=True)
@@ -1,7 +1,12 @@
+import hashlib
+
 import pandas as pd
 import streamlit as st
 import plotly.express as px
 
+from exportacao import botoes_exportacao
+from formatacao import formatar_moeda, formatar_percentual
+
 st.set_page_config(layout="wide")  # Layout mais amplo
 
 st.title("Dashboard de Despesas de TI")
@@ -76,7 +81,7 @@ if uploaded_file:
             if 'FORNECEDOR' in df.columns and 'Total' in df.columns:
                 fornecedor_total = df.groupby('FORNECEDOR')['Total'].sum().sort_values(ascending=False).reset_index()
                 fig1 = px.bar(fornecedor_total, x='FORNECEDOR', y='Total',
-                              text=fornecedor_total['Total'].apply(lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")),
+                              text=fornecedor_total['Total'].pipe(formatar_moeda),
                               labels={'Total': 'Total (R$)'})
                 fig1.update_traces(textposition='outside')
                 st.plotly_chart(fig1, use_container_width=True)
@@ -89,7 +94,7 @@ if uploaded_file:
             df_mes = df_mes.sort_values('Mês')
 
             fig2 = px.bar(df_mes, x='Mês', y='Total',
-                          text=df_mes['Total'].apply(lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")),
+                          text=df_mes['Total'].pipe(formatar_moeda),
                           labels={'Total': 'Total (R$)'})
             fig2.update_traces(textposition='outside')
             st.plotly_chart(fig2, use_container_width=True)
@@ -100,19 +105,16 @@ if uploaded_file:
             total_geral = fornecedor_total['Total'].sum()
             fornecedor_total['%'] = (fornecedor_total['Total'] / total_geral) * 100
             fig3 = px.bar(fornecedor_total.sort_values('%', ascending=False), x='FORNECEDOR', y='%',
-                          text=fornecedor_total['%'].apply(lambda x: f"{x:.1f}%"),
+                          text=fornecedor_total['%'].pipe(formatar_percentual),
                           labels={'%': 'Percentual'})
             fig3.update_traces(textposition='outside')
             st.plotly_chart(fig3, use_container_width=True)
 
-        # Botão para exportar dados filtrados
-        csv = df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="Exportar dados filtrados (CSV)",
-            data=csv,
-            file_name='dados_filtrados.csv',
-            mime='text/csv',
-        )
+        # Exportar dados filtrados: cada formato só é gerado no clique e fica em
+        # cache pelo arquivo enviado e pelos filtros
+        impressao = (hashlib.sha256(uploaded_file.getvalue()).hexdigest(), fornecedores_excluir,
+                     tipos_servicos_filtrar, meses_selecionados)
+        botoes_exportacao(df, 'dados_filtrados', impressao)
 
     except Exception as e:
         st.error(f"Erro ao processar o arquivo: {e}")
@@ -2,6 +2,8 @@ import pandas as pd
 import streamlit as st
 import plotly.express as px
 
+from formatacao import formatar_moeda, formatar_percentual
+
 st.title("Dashboard de Despesas de TI")
 
 uploaded_file = st.file_uploader("Faça upload do arquivo Excel", type=["xlsx"])
@@ -68,7 +70,7 @@ if uploaded_file:
         if 'FORNECEDOR' in df_filtrado.columns and 'Total' in df_filtrado.columns:
             fornecedor_total = df_filtrado.groupby('FORNECEDOR')['Total'].sum().sort_values(ascending=False).reset_index()
             fig1 = px.bar(fornecedor_total, x='FORNECEDOR', y='Total',
-                          text=fornecedor_total['Total'].apply(lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")),
+                          text=fornecedor_total['Total'].pipe(formatar_moeda),
                           labels={'Total': 'Total (R$)'})
             fig1.update_traces(textposition='outside')
             st.plotly_chart(fig1, use_container_width=True)
@@ -82,7 +84,7 @@ if uploaded_file:
         df_mes = df_mes.sort_values('Mês')
 
         fig2 = px.bar(df_mes, x='Mês', y='Total',
-                      text=df_mes['Total'].apply(lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")),
+                      text=df_mes['Total'].pipe(formatar_moeda),
                       labels={'Total': 'Total (R$)'})
         fig2.update_traces(textposition='outside')
         st.plotly_chart(fig2, use_container_width=True)
@@ -94,7 +96,7 @@ if uploaded_file:
             total_geral = fornecedor_total['Total'].sum()
             fornecedor_total['%'] = (fornecedor_total['Total'] / total_geral) * 100
             fig3 = px.bar(fornecedor_total.sort_values('%', ascending=False), x='FORNECEDOR', y='%',
-                          text=fornecedor_total['%'].apply(lambda x: f"{x:.1f}%"),
+                          text=fornecedor_total['%'].pipe(formatar_percentual),
                           labels={'%': 'Percentual'})
             fig3.update_traces(textposition='outside')
             st.plotly_chart(fig3, use_container_width=True)
@@ -1,148 +1,296 @@
+import hashlib
+import os
+from io import BytesIO
+
 import pandas as pd
 import streamlit as st
-import plotly.express as px
+
+from agregacao_incremental import TotaisIncrementais
+from armazem import armazem_compartilhado
+from cubo import agrupar_outros, fornecedores_do_cubo, meses_do_cubo, montar_cubo, serie_para_meses
+from figuras import figura, figura_barras, figura_linhas
+from formatacao import formatar_moeda
+from ingestao import Ingestao, painel_ingestao
+from instrumentacao import Instrumentacao, relatorio_memoria
+from leitura import DatasDivergentes, concatenar_abas, ler_abas, ler_planilha, nomes_das_abas
+from normalizacao import compactar, linhas_sem
+from previa import mostrar_previa
+from snapshot import (PARQUET_DISPONIVEL, carregar_agregado, carregar_snapshot, listar_snapshots,
+                      salvar_snapshot)
 
 st.set_page_config(layout="wide")
 
 st.title("Dashboard de Despesas de TI")
 
-uploaded_file = st.file_uploader("Faça upload do arquivo Excel", type=["xlsx"])
+# Instrumentação opcional: tempo e memória de cada etapa, a cada rerun
+if 'instrumentacao' not in st.session_state:
+    st.session_state['instrumentacao'] = Instrumentacao()
+medidor = st.session_state['instrumentacao']
+medidor.novo_rerun(st.sidebar.toggle("Medir tempo e memória das etapas"))
+
+# Acima deste número de fornecedores, os gráficos mostram os maiores e somam o resto em "Outros"
+max_fornecedores = st.sidebar.slider("Fornecedores exibidos nos gráficos", min_value=5, max_value=100, value=20)
+
+# Snapshot salvo em uma sessão anterior (ou pelo processar_lote.py) dispensa o
+# upload e a leitura do Excel
+opcoes_fonte = ["Upload de arquivo Excel"]
+if PARQUET_DISPONIVEL:
+    opcoes_fonte.append("Snapshot salvo")
+fonte = st.radio("Fonte dos dados:", opcoes_fonte, horizontal=True)
+
+uploaded_file = None
+arquivo_snapshot = None
+memoria = None
+if fonte == "Upload de arquivo Excel":
+    uploaded_file = st.file_uploader("Faça upload do arquivo Excel", type=["xlsx"])
+else:
+    snapshots = listar_snapshots()
+    if snapshots:
+        arquivo_snapshot = st.selectbox("Selecione o snapshot (o mais recente primeiro):", snapshots,
+                                        format_func=os.path.basename)
+
+# Leitura e limpeza ficam no armazém do servidor, indexadas pelo hash do conteúdo
+# do arquivo: os reruns causados pelos filtros, e as outras sessões que enviam a
+# mesma planilha, reaproveitam a planilha já tratada em vez de guardar uma cópia.
+# A planilha fica compactada (chaves categóricas, valores em centavos inteiros),
+# junto com o relatório da memória antes e depois.
+armazem = armazem_compartilhado()
+
+
+def tratar_planilha(chave, nome, conteudo, ingestao=None):
+    """Leitura, snapshot e compactação; com `ingestao`, avisa o progresso de cada etapa."""
+    avisar = ingestao.avisar if ingestao is not None else lambda *args, **kwargs: None
+    avisar("Abrindo a planilha")
+    abas = nomes_das_abas(BytesIO(conteudo))
+    if len(abas) == 1:
+        df = ler_planilha(BytesIO(conteudo), progresso=ingestao and ingestao.progresso_da_leitura)
+    else:
+        # Uma aba por centro de custo (ou por mês): as abas de despesas são lidas em paralelo e empilhadas
+        df = concatenar_abas(ler_abas(BytesIO(conteudo), abas, progresso=ingestao and ingestao.progresso_das_abas))
+
+    # Guarda um snapshot colunar para as próximas sessões
+    if PARQUET_DISPONIVEL:
+        avisar("Gravando o snapshot")
+        salvar_snapshot(df, nome, chave)
+    avisar("Compactando")
+    compacta = compactar(df)
+    return compacta, relatorio_memoria(df, compacta)
+
+
+def iniciar_ingestao(chave, nome, conteudo):
+    """Lê, trata e monta o cubo da planilha numa thread; o resultado vai para o armazém."""
+    def processar(ingestao):
+        df, _ = armazem.obter(('planilha', chave), lambda: tratar_planilha(chave, nome, conteudo, ingestao))
+        ingestao.avisar("Montando o cubo", linhas=0, total=0)
+        carregar_cubo(chave, df)
+
+    return Ingestao(chave, nome, processar).iniciar()
+
+
+def carregar_planilha(chave, nome, conteudo):
+    # Normalmente a ingestão já deixou a planilha no armazém; se ela foi descartada, é refeita aqui mesmo
+    def montar():
+        with st.spinner("Processando planilha..."):
+            return tratar_planilha(chave, nome, conteudo)
+
+    return armazem.obter(('planilha', chave), montar)
+
+
+def carregar_planilha_do_snapshot(chave, caminho):
+    def montar():
+        df = carregar_snapshot(caminho)
+        compacta = compactar(df)
+        return compacta, relatorio_memoria(df, compacta)
+
+    return armazem.obter(('planilha', chave), montar)
+
+
+def carregar_cubo(chave, df, snapshot=None):
+    def montar():
+        # O processamento em lote já deixa o cubo pronto ao lado do snapshot
+        if snapshot:
+            cubo = carregar_agregado(snapshot, 'cubo')
+            if cubo is not None:
+                return cubo
+        return montar_cubo(df)
 
-def formatar_valor(x):
-    return f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    return armazem.obter(('cubo', chave), montar)
 
-if uploaded_file:
+
+def mensagem_de_erro(erro):
+    if isinstance(erro, DatasDivergentes):
+        # Somar as abas juntaria anos diferentes na mesma coluna de mês
+        return (f"{erro}. Este dashboard mostra um ano por vez; para planilhas com uma aba por ano, "
+                f"use o app18, que monta o histórico de vários anos.")
+    return f"Erro ao processar o arquivo: {erro}"
+
+
+def mostrar_grafico(nome, fig):
+    # O envio inclui a serialização da figura para o navegador
+    with medidor.etapa(f'{nome}: envio'):
+        st.plotly_chart(fig, use_container_width=True)
+
+
+# Trocar o fornecedor só refaz este fragmento: o seletor, a fatia dos totais e o
+# gráfico 4. O resto da página fica como está, sem rodar o script de novo.
+@st.fragment
+def evolucao_por_fornecedor(totais, meses_selecionados):
+    fornecedores = totais.fornecedores_ativos()
+    if not fornecedores:
+        st.info("Todos os fornecedores estão excluídos: não há evolução por fornecedor para mostrar.")
+        return
+    fornecedor_selecionado = st.selectbox("Selecione o fornecedor:", fornecedores, index=0)
+
+    with medidor.etapa('gráfico 4: montagem'):
+        df_melt_fornecedor = serie_para_meses(totais.evolucao_fornecedor(fornecedor_selecionado, meses_selecionados),
+                                              'Despesa', meses_selecionados)
+        df_melt_fornecedor['FORNECEDOR'] = fornecedor_selecionado
+
+        fig4 = figura(figura_linhas, df_melt_fornecedor, x='Mês', y='Despesa', cor='FORNECEDOR',
+                      rotulos={'Despesa': 'Despesa (R$)'}, margem=dict(t=50, b=100))
+    mostrar_grafico('gráfico 4', fig4)
+
+
+if uploaded_file or arquivo_snapshot:
     try:
-        df = pd.read_excel(uploaded_file, header=1)
-        df = df.iloc[2:].reset_index(drop=True)
-
-        # Excluir colunas desnecessárias
-        for col in ['Unnamed: 0', 'Unnamed: 6', "Unnamed: 19", 'STATUS', 'CONTRATO']:
-            if col in df.columns:
-                df = df.drop(columns=[col])
-        
-        # Excluir colunas STATUS, CONTRATO e Vence sem mexer no restante do código
-        for col in ['STATUS', 'Contrato', 'Vence']:
-            if col in df.columns:
-                df = df.drop(columns=[col])
-
-        # Remover colunas duplicadas 'dez/25'
-        dez_cols = [col for col in df.columns if col == 'dez/25']
-        if len(dez_cols) > 1:
-            idxs = [i for i, col in enumerate(df.columns) if col == 'dez/25']
-            cols_to_drop = [df.columns[i] for i in idxs[1:]]
-            df = df.drop(columns=cols_to_drop)
-
-        # Renomear colunas dos meses
-        nomes_meses = ['jan/25', 'fev/25', 'mar/25', 'abr/25', 'mai/25', 'jun/25',
-                       'jul/25', 'ago/25', 'set/25', 'out/25', 'nov/25', 'dez/25', 'Total']
-        col_inicio = 2
-        for i, nome_mes in enumerate(nomes_meses):
-            pos = col_inicio + i
-            if pos < len(df.columns):
-                df.rename(columns={df.columns[pos]: nome_mes}, inplace=True)
-
-        # Remover linhas com 'TIPO DE SERVIÇOS' vazias
-        if 'TIPO DE SERVIÇOS' in df.columns:
-            df = df[df['TIPO DE SERVIÇOS'].notna() & (df['TIPO DE SERVIÇOS'].astype(str).str.strip() != "")]
+        if uploaded_file:
+            conteudo = uploaded_file.getvalue()
+            chave = hashlib.sha256(conteudo).hexdigest()
+            if ('planilha', chave) in armazem:
+                st.session_state.pop('ingestao', None)
+            else:
+                # Planilha nova: processada numa thread, e o painel acompanha até o fim
+                ingestao = st.session_state.get('ingestao')
+                if ingestao is None or ingestao.chave != chave:
+                    if ingestao is not None:
+                        ingestao.cancelar()
+                    ingestao = st.session_state['ingestao'] = iniciar_ingestao(chave, uploaded_file.name, conteudo)
+                if ingestao.cancelada:
+                    st.warning(f"Processamento de {ingestao.nome} cancelado.")
+                    if st.button("Processar novamente"):
+                        del st.session_state['ingestao']
+                        st.rerun()
+                    st.stop()
+                if ingestao.erro is not None:
+                    # Sai da sessão: o próximo rerun (ou o mesmo arquivo enviado de novo) processa do zero
+                    del st.session_state['ingestao']
+                    st.error(mensagem_de_erro(ingestao.erro))
+                    if st.button("Processar novamente"):
+                        st.rerun()
+                    st.stop()
+                if not ingestao.terminada:
+                    painel_ingestao()
+                    st.stop()
+            with medidor.etapa('leitura'):
+                df, memoria = carregar_planilha(chave, uploaded_file.name, conteudo)
+        else:
+            chave = f"{arquivo_snapshot}:{os.path.getmtime(arquivo_snapshot)}"
+            with medidor.etapa('leitura'):
+                df, memoria = carregar_planilha_do_snapshot(chave, arquivo_snapshot)
+            st.caption(f"Dados carregados do snapshot {arquivo_snapshot}")
 
-        # Filtro para excluir fornecedores
-        if 'FORNECEDOR' in df.columns:
-            fornecedores = df['FORNECEDOR'].dropna().unique().tolist()
-            fornecedores_excluir = st.multiselect("Selecione os fornecedores que deseja excluir:", fornecedores)
-            if fornecedores_excluir:
-                df = df[~df['FORNECEDOR'].isin(fornecedores_excluir)]
+        # Todos os gráficos saem do cubo fornecedor × tipo de serviço × mês
+        with medidor.etapa('cubo'):
+            cubo = carregar_cubo(chave, df, arquivo_snapshot)
 
-        df_filtrado = df.copy()
+        # Os totais ficam na sessão e só recebem a diferença quando um filtro muda
+        if st.session_state.get('totais_chave') != chave:
+            st.session_state['totais_chave'] = chave
+            st.session_state['totais'] = TotaisIncrementais(cubo)
+        totais = st.session_state['totais']
+
+        # Filtro para excluir fornecedores
+        fornecedores = fornecedores_do_cubo(cubo)
+        fornecedores_excluir = st.multiselect("Selecione os fornecedores que deseja excluir:", fornecedores)
+        with medidor.etapa('filtros'):
+            totais.atualizar_exclusoes(fornecedores_excluir)
+            # A planilha não é filtrada nem copiada: a prévia recebe a máscara das linhas mantidas,
+            # tirada dos códigos da categoria FORNECEDOR
+            linhas = linhas_sem(df, 'FORNECEDOR', fornecedores_excluir) if fornecedores_excluir else None
 
-        # Converter colunas de valores para numérico
         meses_colunas = ['jan/25', 'fev/25', 'mar/25', 'abr/25', 'mai/25', 'jun/25',
                          'jul/25', 'ago/25', 'set/25', 'out/25', 'nov/25', 'dez/25', 'Total']
-        for col in meses_colunas:
-            if col in df_filtrado.columns:
-                df_filtrado[col] = pd.to_numeric(df_filtrado[col], errors='coerce')
 
-        # Prévia da tabela com filtro aplicado e maior altura e largura
+        # Prévia paginada: só a página visível vai para o navegador
         st.subheader("Prévia dos dados após correções e filtro")
-        st.dataframe(df_filtrado, height=900, width=1400)
+        with medidor.etapa('prévia'):
+            mostrar_previa(df, linhas=linhas)
 
         # Gráfico 1 – Despesa total por fornecedor (em R$)
         st.subheader("Despesa total por fornecedor (R$)")
-        if 'FORNECEDOR' in df_filtrado.columns and 'Total' in df_filtrado.columns:
-            fornecedor_total = df_filtrado.groupby('FORNECEDOR')['Total'].sum().sort_values(ascending=False).reset_index()
-            fig1 = px.bar(fornecedor_total, x='FORNECEDOR', y='Total',
-                          text=fornecedor_total['Total'].apply(formatar_valor),
-                          labels={'Total': 'Total (R$)'} )
-            fig1.update_traces(textposition='outside')
-            st.plotly_chart(fig1, use_container_width=True)
+        if 'Total' in cubo.columns:
+            with medidor.etapa('gráfico 1: montagem'):
+                fornecedor_total = agrupar_outros(totais.total_por_fornecedor(), max_fornecedores).reset_index()
+                fig1 = figura(figura_barras, fornecedor_total, x='FORNECEDOR', y='Total',
+                              rotulos={'Total': 'Total (R$)'})
+            mostrar_grafico('gráfico 1', fig1)
 
         # Gráfico 2 – Despesa total por mês
         st.subheader("Despesa total por mês")
-        meses_existentes = [m for m in meses_colunas[:-1] if m in df_filtrado.columns]
-        df_mes = df_filtrado[meses_existentes].sum().reset_index()
-        df_mes.columns = ['Mês', 'Total']
-        df_mes['Mês'] = pd.Categorical(df_mes['Mês'], categories=meses_colunas[:-1], ordered=True)
-        df_mes = df_mes.sort_values('Mês')
-
-        fig2 = px.bar(df_mes, x='Mês', y='Total',
-                      text=df_mes['Total'].apply(formatar_valor),
-                      labels={'Total': 'Total (R$)'} )
-        fig2.update_traces(textposition='outside')
-        st.plotly_chart(fig2, use_container_width=True)
+        with medidor.etapa('gráfico 2: montagem'):
+            meses_existentes = meses_do_cubo(cubo)
+            df_mes = serie_para_meses(totais.total_por_mes(meses_existentes), 'Total', meses_colunas[:-1])
+
+            fig2 = figura(figura_barras, df_mes, x='Mês', y='Total', rotulos={'Total': 'Total (R$)'})
+        mostrar_grafico('gráfico 2', fig2)
 
         # Gráfico 3 – Participação percentual das despesas por fornecedor
         st.subheader("Participação percentual das despesas por fornecedor")
-        if 'FORNECEDOR' in df_filtrado.columns and 'Total' in df_filtrado.columns:
-            fornecedor_total = df_filtrado.groupby('FORNECEDOR')['Total'].sum().reset_index()
-            total_geral = fornecedor_total['Total'].sum()
-            fornecedor_total['%'] = (fornecedor_total['Total'] / total_geral) * 100
-            fornecedor_total = fornecedor_total.sort_values('%', ascending=False)
-            fig3 = px.bar(fornecedor_total, x='FORNECEDOR', y='%',
-                          text=fornecedor_total['%'].apply(lambda x: f"{x:.1f}%"),
-                          labels={'%': 'Percentual'})
-            fig3.update_traces(textposition='outside')
-            st.plotly_chart(fig3, use_container_width=True)
+        if 'Total' in cubo.columns:
+            with medidor.etapa('gráfico 3: montagem'):
+                fornecedor_total = agrupar_outros(totais.participacao_por_fornecedor().set_index('FORNECEDOR')['%'],
+                                                  max_fornecedores).reset_index()
+                fig3 = figura(figura_barras, fornecedor_total, x='FORNECEDOR', y='%', formato='percentual',
+                              rotulos={'%': 'Percentual'})
+            mostrar_grafico('gráfico 3', fig3)
 
         # Filtro por período (meses)
         st.subheader("Filtro por período")
-        meses_disponiveis = [m for m in meses_colunas[:-1] if m in df_filtrado.columns]
+        meses_disponiveis = meses_do_cubo(cubo)
         meses_selecionados = st.multiselect("Selecione o(s) mês(es) para visualizar:", meses_disponiveis, default=meses_disponiveis)
 
-        if meses_selecionados:
-            df_periodo = df_filtrado[['FORNECEDOR'] + meses_selecionados].copy()
+        with medidor.etapa('filtro de meses'):
+            totais.atualizar_meses(meses_selecionados)
 
+        if meses_selecionados:
             # Evolução mensal por fornecedor com seleção automática
             st.subheader("Evolução mensal por fornecedor")
-            fornecedores = df_filtrado['FORNECEDOR'].dropna().unique().tolist()
-            fornecedor_selecionado = st.selectbox("Selecione o fornecedor:", fornecedores, index=0)
-
-            df_fornecedor = df_periodo[df_periodo['FORNECEDOR'] == fornecedor_selecionado]
-            df_melt_fornecedor = df_fornecedor.melt(id_vars='FORNECEDOR', var_name='Mês', value_name='Despesa')
-            df_melt_fornecedor['Mês'] = pd.Categorical(df_melt_fornecedor['Mês'], categories=meses_selecionados, ordered=True)
-            df_melt_fornecedor = df_melt_fornecedor.sort_values('Mês')
-
-            fig4 = px.line(df_melt_fornecedor, x='Mês', y='Despesa', color='FORNECEDOR', markers=True,
-                           labels={'Despesa': 'Despesa (R$)', 'Mês': 'Mês'},
-                           text=df_melt_fornecedor['Despesa'].apply(formatar_valor))
-            fig4.update_traces(textposition='top center')
-            fig4.update_layout(margin=dict(t=50, b=100))
-            st.plotly_chart(fig4, use_container_width=True)
+            evolucao_por_fornecedor(totais, meses_selecionados)
 
             # Evolução total por mês
             st.subheader("Evolução total por mês")
-            df_evol_total = df_periodo[meses_selecionados].sum().reset_index()
-            df_evol_total.columns = ['Mês', 'Despesa']
-            df_evol_total['Mês'] = pd.Categorical(df_evol_total['Mês'], categories=meses_selecionados, ordered=True)
-            df_evol_total = df_evol_total.sort_values('Mês')
+            st.metric("Despesa no período selecionado", formatar_moeda(totais.total_periodo))
+            with medidor.etapa('gráfico 5: montagem'):
+                df_evol_total = serie_para_meses(totais.total_por_mes(meses_selecionados), 'Despesa', meses_selecionados)
 
-            fig5 = px.line(df_evol_total, x='Mês', y='Despesa', markers=True,
-                           labels={'Despesa': 'Despesa (R$)', 'Mês': 'Mês'},
-                           text=df_evol_total['Despesa'].apply(formatar_valor))
-            fig5.update_traces(textposition='top center')
-            st.plotly_chart(fig5, use_container_width=True)
+                fig5 = figura(figura_linhas, df_evol_total, x='Mês', y='Despesa', rotulos={'Despesa': 'Despesa (R$)'})
+            mostrar_grafico('gráfico 5', fig5)
 
     except Exception as e:
-        st.error(f"Erro ao processar o arquivo: {e}")
+        st.error(mensagem_de_erro(e))
 
-else:
+elif fonte == "Upload de arquivo Excel":
     st.info("Por favor, faça upload do arquivo Excel para continuar.")
+else:
+    st.info("Nenhum snapshot salvo ainda. Faça upload do arquivo Excel uma vez para criá-lo.")
+
+# Painel da instrumentação, depois de todas as etapas do rerun
+if medidor.ativa:
+    medidor.gravar_log()
+    with st.sidebar:
+        st.subheader("Instrumentação")
+        atual = pd.DataFrame(medidor.do_rerun())
+        if not atual.empty:
+            st.caption(f"Rerun {medidor.rerun}: {atual['segundos'].sum():.3f} s medidos")
+            st.dataframe(atual[['etapa', 'segundos', 'memoria_mb']], hide_index=True)
+            st.caption("Percentis móveis da sessão")
+            st.dataframe(medidor.percentis(), hide_index=True)
+            historico = medidor.tabela()
+            st.download_button("Baixar CSV", historico.to_csv(index=False), "instrumentacao.csv", "text/csv")
+            st.download_button("Baixar JSON", historico.to_json(orient='records', force_ascii=False),
+                               "instrumentacao.json", "application/json")
+        if memoria is not None:
+            st.caption("Memória da planilha, antes e depois de compactada")
+            st.dataframe(memoria, hide_index=True)
+        st.caption("Armazém de planilhas compartilhado pelas sessões")
+        st.dataframe(pd.Series(armazem.estatisticas(), name='valor').to_frame())
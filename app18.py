@@ -0,0 +1,152 @@
+import hashlib
+from io import BytesIO
+
+import streamlit as st
+import plotly.express as px
+
+import banco
+from armazem import armazem_compartilhado
+from fatos import concatenar_fatos, dimensao_datas, fatos_das_abas, meses_por_ano, total_anual, total_mensal
+from formatacao import formatar_moeda
+from leitura import ler_abas
+
+st.set_page_config(layout="wide")
+
+st.title("Dashboard de Despesas de TI – Comparativo entre anos")
+
+uploaded_files = st.file_uploader("Faça upload das planilhas Excel (uma por ano ou unidade)",
+                                  type=["xlsx"], accept_multiple_files=True)
+
+# Com o banco, cada planilha é gravada uma vez no arquivo SQLite e os gráficos saem de consultas
+# agregadas: o histórico de todos os anos já enviados continua disponível sem ficar na memória.
+usar_banco = st.sidebar.toggle("Guardar o histórico no banco local (SQLite)",
+                               help=f"As planilhas ficam em {banco.ARQUIVO_BANCO} e os totais são consultados lá.")
+
+# Cada planilha vira a sua tabela de fatos uma vez só, indexada pelo hash do conteúdo,
+# no armazém compartilhado por todas as sessões do servidor
+armazem = armazem_compartilhado()
+
+
+def fatos_da_planilha(nome, conteudo):
+    """Fatos de todas as abas de despesas da planilha, lidas em paralelo."""
+    return fatos_das_abas(ler_abas(BytesIO(conteudo)), origem=nome)
+
+
+def carregar_fatos(chave, nome, conteudo):
+    def montar():
+        with st.spinner("Processando planilha..."):
+            return fatos_da_planilha(nome, conteudo)
+
+    return armazem.obter(('fatos', chave, nome), montar)
+
+
+def gravar_no_banco(arquivos):
+    """Grava no banco as planilhas que ainda não estão lá; as já gravadas nem são lidas."""
+    for arquivo in arquivos:
+        conteudo = arquivo.getvalue()
+        chave = hashlib.sha256(conteudo).hexdigest()
+        if not banco.planilha_carregada(chave):
+            with st.spinner(f"Gravando {arquivo.name} no banco..."):
+                fatos_arquivo = fatos_da_planilha(arquivo.name, conteudo)
+                banco.carregar_fatos(fatos_arquivo, chave, arquivo.name)
+
+
+# Os resultados das consultas são pequenos; ficam em cache até entrar planilha nova no banco (`versao`)
+@st.cache_data(max_entries=32, show_spinner=False)
+def consultar_mensal(versao, excluir):
+    return banco.total_mensal(list(excluir))
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def consultar_por_fornecedor(versao, excluir, ano):
+    return banco.total_por_fornecedor(list(excluir), ano=ano)
+
+
+tem_dados = bool(uploaded_files)
+if usar_banco:
+    try:
+        gravar_no_banco(uploaded_files or [])
+        resumo_banco = banco.resumo()
+        tem_dados = resumo_banco['lancamentos'] > 0
+    except Exception as e:
+        st.error(f"Erro ao gravar no banco: {e}")
+        tem_dados = False
+
+if tem_dados:
+    try:
+        if usar_banco:
+            fornecedores = banco.fornecedores()
+        else:
+            lista_fatos = []
+            for arquivo in uploaded_files:
+                conteudo = arquivo.getvalue()
+                chave = hashlib.sha256(conteudo).hexdigest()
+                lista_fatos.append(carregar_fatos(chave, arquivo.name, conteudo))
+            fatos = concatenar_fatos(lista_fatos)
+            fornecedores = fatos['FORNECEDOR'].cat.categories.tolist()
+
+        # Filtro para excluir fornecedores
+        fornecedores_excluir = st.multiselect("Selecione os fornecedores que deseja excluir:", fornecedores)
+        if usar_banco:
+            versao = tuple(resumo_banco.values())
+            mensal = consultar_mensal(versao, tuple(fornecedores_excluir))
+            anual = mensal.groupby(mensal.index.year.rename('Ano')).sum()
+            origem = f"{resumo_banco['planilhas']} planilha(s) no banco, {resumo_banco['lancamentos']} lançamentos"
+        else:
+            if fornecedores_excluir:
+                fatos = fatos[~fatos['FORNECEDOR'].isin(fornecedores_excluir)]
+            mensal = total_mensal(fatos)
+            anual = total_anual(fatos)
+            origem = f"{len(uploaded_files)} planilha(s), {len(fatos)} lançamentos"
+
+        datas = dimensao_datas(mensal.index.to_frame())
+        anos = sorted(datas['Ano'].unique().tolist())
+        st.caption(f"{origem}, de {datas['Rótulo'].iloc[0]} a {datas['Rótulo'].iloc[-1]}")
+
+        # Gráfico 1 – Despesa total por ano
+        st.subheader("Despesa total por ano")
+        df_ano = anual.reset_index()
+        df_ano['Ano'] = df_ano['Ano'].astype(str)
+        fig1 = px.bar(df_ano, x='Ano', y='Valor',
+                      text=df_ano['Valor'].pipe(formatar_moeda),
+                      labels={'Valor': 'Total (R$)'})
+        fig1.update_traces(textposition='outside')
+        st.plotly_chart(fig1, use_container_width=True)
+
+        # Gráfico 2 – Mesmo mês lado a lado em cada ano
+        st.subheader("Despesa mensal comparada entre anos")
+        df_comparacao = meses_por_ano(mensal).rename_axis('Mês').reset_index().melt(
+            id_vars='Mês', var_name='Ano', value_name='Valor').dropna(subset=['Valor'])
+        df_comparacao['Ano'] = df_comparacao['Ano'].astype(str)
+        fig2 = px.bar(df_comparacao, x='Mês', y='Valor', color='Ano', barmode='group',
+                      labels={'Valor': 'Total (R$)'})
+        st.plotly_chart(fig2, use_container_width=True)
+
+        # Gráfico 3 – Série mensal contínua, atravessando os anos
+        st.subheader("Evolução mensal")
+        df_mensal = mensal.reset_index()
+        df_mensal['Mês'] = datas.loc[df_mensal['Data'], 'Rótulo'].to_numpy()
+        fig3 = px.line(df_mensal, x='Mês', y='Valor', markers=True,
+                       labels={'Valor': 'Despesa (R$)'})
+        st.plotly_chart(fig3, use_container_width=True)
+
+        # Gráfico 4 – Fornecedor por ano
+        st.subheader("Despesa por fornecedor em cada ano")
+        ano_selecionado = st.selectbox("Selecione o ano:", anos, index=len(anos) - 1)
+        if usar_banco:
+            por_fornecedor = consultar_por_fornecedor(versao, tuple(fornecedores_excluir), ano_selecionado)
+        else:
+            fatos_ano = fatos[fatos['Data'].dt.year == ano_selecionado]
+            por_fornecedor = total_anual(fatos_ano, por=['FORNECEDOR'])
+        df_fornecedor = por_fornecedor.reset_index().sort_values('Valor', ascending=False)
+        fig4 = px.bar(df_fornecedor, x='FORNECEDOR', y='Valor',
+                      text=df_fornecedor['Valor'].pipe(formatar_moeda),
+                      labels={'Valor': 'Total (R$)'})
+        fig4.update_traces(textposition='outside')
+        st.plotly_chart(fig4, use_container_width=True)
+
+    except Exception as e:
+        st.error(f"Erro ao processar o arquivo: {e}")
+
+else:
+    st.info("Por favor, faça upload de uma ou mais planilhas Excel para continuar.")
@@ -0,0 +1,139 @@
+"""Armazém de planilhas tratadas e agregados, compartilhado por todas as sessões do servidor.
+
+O `st.cache_data` devolve uma cópia nova (despicklada) a cada chamada: com
+várias pessoas abrindo o mesmo `despesas_ti.xlsx`, cada sessão segura a sua
+cópia da planilha. Aqui existe um armazém só por processo, indexado pelo
+conteúdo (o hash do arquivo mais o tipo do dado), e todas as sessões recebem
+o mesmo objeto: a memória cresce com o número de planilhas distintas, não com
+o número de usuários.
+
+O armazém tem um limite de bytes e descarta primeiro o item usado há mais
+tempo (LRU). Cada chave é montada uma vez só, mesmo com duas sessões pedindo
+a mesma planilha ao mesmo tempo: a segunda espera a primeira terminar. Os
+DataFrames saem como cópias rasas; com o copy-on-write do pandas, alterar a
+cópia nunca altera o original compartilhado.
+"""
+import collections
+import sys
+import threading
+
+import pandas as pd
+import streamlit as st
+
+LIMITE_PADRAO_MB = 512
+
+
+def tamanho_em_bytes(valor):
+    """Memória aproximada de um valor guardado (DataFrames contam o texto das strings)."""
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, (pd.Series, pd.Index)):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, (tuple, list)):
+        return sum(tamanho_em_bytes(v) for v in valor)
+    if isinstance(valor, dict):
+        return sum(tamanho_em_bytes(v) for v in valor.values())
+    return sys.getsizeof(valor)
+
+
+def _somente_leitura(valor):
+    """Cópia rasa dos objetos do pandas: quem recebe pode alterar sem tocar no original."""
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return valor.copy(deep=False)
+    if isinstance(valor, tuple):
+        return tuple(_somente_leitura(v) for v in valor)
+    return valor
+
+
+class ArmazemDados:
+    """Itens indexados por chave, com descarte LRU por total de bytes e contadores de acerto e falta."""
+
+    def __init__(self, limite_bytes=LIMITE_PADRAO_MB * 1024 ** 2):
+        self.limite_bytes = limite_bytes
+        self.bytes = 0
+        self.acertos = 0
+        self.faltas = 0
+        self.descartes = 0
+        self._itens = collections.OrderedDict()
+        self._trava = threading.Lock()
+        # Uma trava por chave em montagem, para a mesma planilha não ser lida duas vezes
+        self._montando = {}
+
+    def _buscar(self, chave):
+        with self._trava:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return True, self._itens[chave][0]
+        return False, None
+
+    def obter(self, chave, montar):
+        """Valor de `chave`; na falta, chama `montar()` e guarda o resultado."""
+        achou, valor = self._buscar(chave)
+        if achou:
+            return _somente_leitura(valor)
+
+        with self._trava:
+            trava_chave = self._montando.setdefault(chave, threading.Lock())
+        with trava_chave:
+            # Outra sessão pode ter montado enquanto esta esperava
+            achou, valor = self._buscar(chave)
+            if achou:
+                return _somente_leitura(valor)
+            try:
+                valor = montar()
+                self._guardar(chave, valor)
+            finally:
+                with self._trava:
+                    self._montando.pop(chave, None)
+        return _somente_leitura(valor)
+
+    def _guardar(self, chave, valor):
+        tamanho = tamanho_em_bytes(valor)
+        with self._trava:
+            self.faltas += 1
+            if chave in self._itens:
+                self.bytes -= self._itens.pop(chave)[1]
+            self._itens[chave] = (valor, tamanho)
+            self.bytes += tamanho
+            # O item recém-montado fica mesmo se sozinho passar do limite
+            while self.bytes > self.limite_bytes and len(self._itens) > 1:
+                _, (_, tamanho_antigo) = self._itens.popitem(last=False)
+                self.bytes -= tamanho_antigo
+                self.descartes += 1
+
+    def descartar(self, chave):
+        with self._trava:
+            if chave in self._itens:
+                self.bytes -= self._itens.pop(chave)[1]
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+            self.bytes = 0
+
+    def __contains__(self, chave):
+        with self._trava:
+            return chave in self._itens
+
+    def __len__(self):
+        return len(self._itens)
+
+    def estatisticas(self):
+        with self._trava:
+            consultas = self.acertos + self.faltas
+            return {
+                'itens': len(self._itens),
+                'MB': self.bytes / 1024 ** 2,
+                'limite (MB)': self.limite_bytes / 1024 ** 2,
+                'acertos': self.acertos,
+                'faltas': self.faltas,
+                'descartes': self.descartes,
+                'taxa de acerto': self.acertos / consultas if consultas else 0.0,
+            }
+
+
+@st.cache_resource(show_spinner=False)
+def armazem_compartilhado(limite_mb=LIMITE_PADRAO_MB):
+    """O armazém do processo: o mesmo objeto para todas as sessões e reruns."""
+    return ArmazemDados(limite_mb * 1024 ** 2)
@@ -0,0 +1,149 @@
+"""Banco SQLite local com os fatos das despesas, para consultar o histórico sem carregá-lo na memória.
+
+Cada planilha normalizada entra uma vez só (pelo hash do conteúdo) na tabela
+`despesas`, em formato longo: uma linha por planilha, fornecedor, tipo de
+serviço e mês, com índices por fornecedor, tipo de serviço e mês. Fornecedor
+e tipo são ids inteiros das tabelas de nomes e o mês é o inteiro AAAAMM: o
+arquivo fica com metade do tamanho e os agrupamentos comparam inteiros. As visões
+do dashboard (totais por mês e por fornecedor em cada ano) são consultas SQL
+agregadas: só o resultado, de poucas linhas, chega ao pandas, e o histórico
+de vários anos fica no arquivo.
+
+As funções de consulta devolvem as mesmas Series das funções equivalentes de
+fatos.py, então o dashboard troca uma fonte pela outra sem mudar os gráficos.
+Cada chamada abre a sua conexão: o SQLite abre em microssegundos, e assim
+nenhuma conexão é compartilhada entre as threads dos reruns.
+"""
+import contextlib
+import itertools
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+DIRETORIO_BANCO = 'dados'
+ARQUIVO_BANCO = os.path.join(DIRETORIO_BANCO, 'despesas.sqlite')
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS planilhas (
+    id INTEGER PRIMARY KEY,
+    chave TEXT UNIQUE NOT NULL,
+    nome TEXT,
+    carregada_em TEXT
+);
+CREATE TABLE IF NOT EXISTS fornecedores (id INTEGER PRIMARY KEY, nome TEXT UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS tipos (id INTEGER PRIMARY KEY, nome TEXT UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS despesas (
+    planilha INTEGER NOT NULL REFERENCES planilhas(id),
+    fornecedor INTEGER REFERENCES fornecedores(id),
+    tipo INTEGER REFERENCES tipos(id),
+    mes INTEGER NOT NULL,
+    valor REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS despesas_fornecedor ON despesas (fornecedor, mes);
+CREATE INDEX IF NOT EXISTS despesas_tipo ON despesas (tipo, mes);
+CREATE INDEX IF NOT EXISTS despesas_mes ON despesas (mes, fornecedor, valor);
+"""
+
+
+@contextlib.contextmanager
+def conexao(caminho=ARQUIVO_BANCO):
+    """Conexão com o banco (criado na primeira vez), confirmada ao sair do `with`."""
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    con = sqlite3.connect(caminho)
+    try:
+        con.executescript(ESQUEMA)
+        with con:
+            yield con
+    finally:
+        con.close()
+
+
+def planilha_carregada(chave, caminho=ARQUIVO_BANCO):
+    with conexao(caminho) as con:
+        return con.execute("SELECT 1 FROM planilhas WHERE chave = ?", (chave,)).fetchone() is not None
+
+
+def _ids(con, tabela, coluna):
+    """Id de cada linha de uma coluna categórica na tabela de nomes (None onde falta o valor)."""
+    nomes = coluna.cat.categories.tolist()
+    con.executemany(f"INSERT OR IGNORE INTO {tabela} (nome) VALUES (?)", [(n,) for n in nomes])
+    id_do_nome = dict(con.execute(f"SELECT nome, id FROM {tabela}"))
+    # Código -1 (valor ausente) cai na última posição, com None
+    ids = np.array([id_do_nome[n] for n in nomes] + [None], dtype=object)
+    return ids[coluna.cat.codes.to_numpy()].tolist()
+
+
+def carregar_fatos(fatos, chave, nome, caminho=ARQUIVO_BANCO):
+    """Grava a tabela de fatos (de `fatos.montar_fatos`) de uma planilha; devolve False se já estava no banco."""
+    with conexao(caminho) as con:
+        if con.execute("SELECT 1 FROM planilhas WHERE chave = ?", (chave,)).fetchone():
+            return False
+        cursor = con.execute("INSERT INTO planilhas (chave, nome, carregada_em) VALUES (?, ?, ?)",
+                             (chave, nome, time.strftime('%Y-%m-%dT%H:%M:%S')))
+        datas = fatos['Data'].dt
+        linhas = zip(
+            itertools.repeat(cursor.lastrowid),
+            _ids(con, 'fornecedores', fatos['FORNECEDOR']),
+            _ids(con, 'tipos', fatos['TIPO DE SERVIÇOS']),
+            (datas.year * 100 + datas.month).tolist(),
+            fatos['Valor'].tolist(),
+        )
+        con.executemany("INSERT INTO despesas (planilha, fornecedor, tipo, mes, valor) VALUES (?, ?, ?, ?, ?)",
+                        linhas)
+        return True
+
+
+def _onde(excluir=(), ano=None, condicoes=()):
+    """Cláusula WHERE e parâmetros dos filtros do dashboard."""
+    condicoes = list(condicoes)
+    parametros = []
+    if excluir:
+        # Despesas sem fornecedor continuam, como no `~isin` do pandas
+        condicoes.append(f"(fornecedor IS NULL OR fornecedor NOT IN "
+                         f"(SELECT id FROM fornecedores WHERE nome IN ({', '.join('?' * len(excluir))})))")
+        parametros += list(excluir)
+    if ano is not None:
+        # Intervalo no mês (AAAAMM), para usar o índice
+        condicoes.append("mes BETWEEN ? AND ?")
+        parametros += [ano * 100 + 1, ano * 100 + 12]
+    return (f"WHERE {' AND '.join(condicoes)}" if condicoes else ''), parametros
+
+
+def _consulta(sql, parametros, caminho):
+    with conexao(caminho) as con:
+        return pd.read_sql_query(sql, con, params=parametros)
+
+
+def resumo(caminho=ARQUIVO_BANCO):
+    """Planilhas e lançamentos guardados no banco."""
+    with conexao(caminho) as con:
+        planilhas, = con.execute("SELECT COUNT(*) FROM planilhas").fetchone()
+        lancamentos, = con.execute("SELECT COUNT(*) FROM despesas").fetchone()
+    return {'planilhas': planilhas, 'lancamentos': lancamentos}
+
+
+def fornecedores(caminho=ARQUIVO_BANCO):
+    return _consulta("SELECT nome FROM fornecedores ORDER BY nome", [], caminho)['nome'].tolist()
+
+
+def total_mensal(excluir=(), caminho=ARQUIVO_BANCO):
+    """Soma por mês, como `fatos.total_mensal(fatos)`."""
+    onde, parametros = _onde(excluir)
+    tabela = _consulta(f"SELECT mes, SUM(valor) AS Valor FROM despesas {onde} GROUP BY mes ORDER BY mes",
+                       parametros, caminho)
+    datas = pd.to_datetime(tabela['mes'].astype(str), format='%Y%m')
+    return pd.Series(tabela['Valor'].to_numpy(), index=pd.DatetimeIndex(datas, name='Data'), name='Valor')
+
+
+def total_por_fornecedor(excluir=(), ano=None, caminho=ARQUIVO_BANCO):
+    """Soma por ano e fornecedor, como `fatos.total_anual(fatos, por=['FORNECEDOR'])`."""
+    # Agrupa pelos ids e só depois troca pelos nomes, em poucas linhas
+    onde, parametros = _onde(excluir, ano, ['fornecedor IS NOT NULL'])
+    tabela = _consulta(f"SELECT t.Ano, f.nome AS FORNECEDOR, t.Valor FROM "
+                       f"(SELECT mes / 100 AS Ano, fornecedor, SUM(valor) AS Valor FROM despesas {onde} "
+                       f"GROUP BY Ano, fornecedor) AS t JOIN fornecedores AS f ON f.id = t.fornecedor "
+                       f"ORDER BY t.Ano, f.nome", parametros, caminho)
+    return tabela.set_index(['Ano', 'FORNECEDOR'])['Valor']
@@ -0,0 +1,55 @@
+"""Compara a leitura das abas de uma pasta de trabalho uma a uma e em processos paralelos.
+
+Uso: python benchmark_abas.py [--abas 4] [--linhas 20000] [--processos 4]
+
+Gera (com o gerar_planilha) uma pasta com uma aba de resumo e `--abas` abas de
+despesas, e mede `ler_abas` com um processo e com `--processos`. Em paralelo,
+o tempo total tende ao da aba mais lenta mais a partida dos processos; numa
+máquina de uma CPU só não há ganho a medir. A medição em paralelo ignora o
+`TAMANHO_MINIMO_PARALELO`, que no uso normal manda os arquivos pequenos para
+a leitura sequencial.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from gerar_planilha import escrever_planilha
+from leitura import concatenar_abas, ler_abas, ler_planilha
+
+
+def medir(funcao, *args, **kwargs):
+    inicio = time.perf_counter()
+    resultado = funcao(*args, **kwargs)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--abas', type=int, default=4)
+    parser.add_argument('--linhas', type=int, default=20_000, help="linhas por aba")
+    parser.add_argument('--processos', type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = os.path.join(diretorio, 'abas.xlsx')
+        escrever_planilha(arquivo, args.linhas, abas=args.abas)
+        megabytes = os.path.getsize(arquivo) / 1e6
+        print(f"{args.abas} abas de {args.linhas} linhas, {megabytes:.1f} MB ({os.cpu_count()} CPUs)")
+
+        tempos_aba = {}
+        for aba in [f'Centro de custo {i}' for i in range(1, args.abas + 1)]:
+            _, tempos_aba[aba] = medir(ler_planilha, arquivo, aba=aba)
+        print(f"aba mais lenta: {max(tempos_aba.values()):.2f} s / soma das abas: {sum(tempos_aba.values()):.2f} s")
+
+        sequencial, tempo_sequencial = medir(ler_abas, arquivo, processos=1)
+        paralelo, tempo_paralelo = medir(ler_abas, arquivo, processos=args.processos, tamanho_minimo=0)
+        print(f"ler_abas: 1 processo {tempo_sequencial:.2f} s / {args.processos} processos {tempo_paralelo:.2f} s")
+
+        pd.testing.assert_frame_equal(concatenar_abas(sequencial), concatenar_abas(paralelo))
+
+
+if __name__ == '__main__':
+    main()
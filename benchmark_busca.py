@@ -0,0 +1,65 @@
+"""Compara a exclusão por palavra-chave do app.py (`str.lower().str.contains`) com busca.IndiceBusca.
+
+Uso: python benchmark_busca.py [--linhas 100000 1000000]
+
+O índice é montado uma vez (o tempo aparece à parte); cada busca depois disso
+é o que roda a cada tecla. Os termos são de uma palavra só (inteira ou só um
+trecho) e sem acento, para os dois métodos acharem as mesmas linhas.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from busca import IndiceBusca
+
+COLUNAS = ['Fornecedor', 'Serviço', 'Descrição']
+TERMOS = ['12', 'nutencao', 'ltda']
+
+
+def excluir_contains(df, palavra):
+    """Exclusão usada no app.py antes do índice de busca (estendida à descrição)."""
+    mascara = np.ones(len(df), dtype=bool)
+    for col in COLUNAS:
+        mascara &= ~df[col].str.lower().str.contains(palavra, regex=False).to_numpy()
+    return mascara
+
+
+def despesas(linhas, seed=0):
+    rng = np.random.default_rng(seed)
+    fornecedores = np.array([f"Fornecedor {i} Ltda" for i in range(300)], dtype=object)
+    servicos = np.array([f"Serviço {i} de manutencao" for i in range(200)], dtype=object)
+    descricoes = np.array([f"Contrato {i} de licença" for i in range(50_000)], dtype=object)
+    return pd.DataFrame({
+        'Fornecedor': fornecedores[rng.integers(0, len(fornecedores), linhas)],
+        'Serviço': servicos[rng.integers(0, len(servicos), linhas)],
+        'Descrição': descricoes[rng.integers(0, len(descricoes), linhas)],
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'linhas':>10} {'termo':<15} {'contains (ms)':>14} {'índice (ms)':>12} {'ganho':>7}")
+    for linhas in args.linhas:
+        df = despesas(linhas)
+        inicio = time.perf_counter()
+        indice = IndiceBusca(df, COLUNAS)
+        print(f"{linhas:>10} {'(montagem)':<15} {'':>14} {(time.perf_counter() - inicio) * 1000:>12.0f}")
+        for termo in TERMOS:
+            inicio = time.perf_counter()
+            esperado = excluir_contains(df, termo)
+            tempo_antigo = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            obtido = indice.filtrar(excluir=termo)
+            tempo_novo = time.perf_counter() - inicio
+            assert (esperado == obtido).all(), termo
+            print(f"{linhas:>10} {termo:<15} {tempo_antigo * 1000:>14.1f} {tempo_novo * 1000:>12.1f} "
+                  f"{tempo_antigo / tempo_novo:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Compara a montagem das cinco figuras do app17 com plotly.express, graph_objects e cache.
+
+Uso: python benchmark_figuras.py [--linhas 100000] [--reruns 20] [--max-fornecedores 20]
+
+Cada rerun simulado tira as tabelas dos gráficos dos totais incrementais,
+monta as cinco figuras e as serializa como o `st.plotly_chart` faz
+(`to_dict` e `plotly.io.to_json`). O cache é medido depois de uma rodada de
+aquecimento, como nos reruns em que os dados dos gráficos não mudaram. Ao
+final confere que os dados das figuras (x, y e textos) são os mesmos nas três
+formas.
+"""
+import argparse
+import json
+import logging
+import time
+
+import plotly.express as px
+import plotly.io as pio
+
+from agregacao_incremental import TotaisIncrementais
+from benchmark_normalizacao import planilha_bruta
+from cubo import agrupar_outros, meses_do_cubo, montar_cubo, serie_para_meses
+from figuras import figura, figura_barras, figura_linhas
+from formatacao import formatar_moeda, formatar_percentual
+from normalizacao import normalizar_planilha
+
+ROTULOS = {'Total': 'Total (R$)', '%': 'Percentual', 'Despesa': 'Despesa (R$)', 'Mês': 'Mês'}
+
+
+def tabelas(totais, meses, max_fornecedores):
+    """As tabelas dos cinco gráficos, como o app17 as monta."""
+    fornecedor_total = agrupar_outros(totais.total_por_fornecedor(), max_fornecedores).reset_index()
+    df_mes = serie_para_meses(totais.total_por_mes(meses), 'Total', meses)
+    participacao = agrupar_outros(totais.participacao_por_fornecedor().set_index('FORNECEDOR')['%'],
+                                  max_fornecedores).reset_index()
+    fornecedor = totais.fornecedores_ativos()[0]
+    df_fornecedor = serie_para_meses(totais.evolucao_fornecedor(fornecedor, meses), 'Despesa', meses)
+    df_fornecedor['FORNECEDOR'] = fornecedor
+    df_total = serie_para_meses(totais.total_por_mes(meses), 'Despesa', meses)
+    return fornecedor_total, df_mes, participacao, df_fornecedor, df_total
+
+
+def figuras_px(fornecedor_total, df_mes, participacao, df_fornecedor, df_total):
+    """Montagem usada no app17 antes do módulo figuras."""
+    fig1 = px.bar(fornecedor_total, x='FORNECEDOR', y='Total', text=fornecedor_total['Total'].pipe(formatar_moeda),
+                  labels=ROTULOS)
+    fig2 = px.bar(df_mes, x='Mês', y='Total', text=df_mes['Total'].pipe(formatar_moeda), labels=ROTULOS)
+    fig3 = px.bar(participacao, x='FORNECEDOR', y='%', text=participacao['%'].pipe(formatar_percentual),
+                  labels=ROTULOS)
+    for fig in (fig1, fig2, fig3):
+        fig.update_traces(textposition='outside')
+    fig4 = px.line(df_fornecedor, x='Mês', y='Despesa', color='FORNECEDOR', markers=True, labels=ROTULOS,
+                   text=df_fornecedor['Despesa'].pipe(formatar_moeda))
+    fig4.update_layout(margin=dict(t=50, b=100))
+    fig5 = px.line(df_total, x='Mês', y='Despesa', markers=True, labels=ROTULOS,
+                   text=df_total['Despesa'].pipe(formatar_moeda))
+    for fig in (fig4, fig5):
+        fig.update_traces(textposition='top center')
+    return [fig1, fig2, fig3, fig4, fig5]
+
+
+def _figuras_go(montar, fornecedor_total, df_mes, participacao, df_fornecedor, df_total):
+    return [
+        montar(figura_barras, fornecedor_total, x='FORNECEDOR', y='Total', rotulos=ROTULOS),
+        montar(figura_barras, df_mes, x='Mês', y='Total', rotulos=ROTULOS),
+        montar(figura_barras, participacao, x='FORNECEDOR', y='%', formato='percentual', rotulos=ROTULOS),
+        montar(figura_linhas, df_fornecedor, x='Mês', y='Despesa', cor='FORNECEDOR', rotulos=ROTULOS,
+               margem=dict(t=50, b=100)),
+        montar(figura_linhas, df_total, x='Mês', y='Despesa', rotulos=ROTULOS),
+    ]
+
+
+def figuras_go(*tabelas_):
+    return _figuras_go(lambda montar, df, **opcoes: montar(df, **opcoes), *tabelas_)
+
+
+def figuras_cache(*tabelas_):
+    return _figuras_go(figura, *tabelas_)
+
+
+def enviar(figs):
+    """O que o st.plotly_chart faz com cada figura antes de mandá-la ao navegador."""
+    return [pio.to_json(fig.to_dict(), validate=False) for fig in figs]
+
+
+def rerun(montar, totais, meses, max_fornecedores):
+    """Tempos de montagem (tabelas e figuras) e de envio de um rerun simulado."""
+    inicio = time.perf_counter()
+    figs = montar(*tabelas(totais, meses, max_fornecedores))
+    meio = time.perf_counter()
+    specs = enviar(figs)
+    return meio - inicio, time.perf_counter() - meio, specs
+
+
+def dados(specs):
+    return [[(t.get('x'), t.get('y'), t.get('text')) for t in json.loads(spec)['data']] for spec in specs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', type=int, default=100_000)
+    parser.add_argument('--reruns', type=int, default=20)
+    parser.add_argument('--max-fornecedores', type=int, default=20)
+    args = parser.parse_args()
+
+    # Fora do `streamlit run`, o cache avisa que está sem runtime a cada chamada
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+    cubo = montar_cubo(normalizar_planilha(planilha_bruta(args.linhas)))
+    totais = TotaisIncrementais(cubo)
+    meses = meses_do_cubo(cubo)
+
+    print(f"{args.linhas} linhas, {len(cubo)} combinações no cubo, média de {args.reruns} reruns")
+    print(f"{'forma':<24} {'montagem (ms)':>14} {'envio (ms)':>11} {'total (ms)':>11}")
+    referencia = None
+    for nome, montar in [('plotly.express', figuras_px), ('graph_objects', figuras_go),
+                         ('graph_objects + cache', figuras_cache)]:
+        # O aquecimento carrega os templates do plotly e, na forma com cache, preenche o cache
+        _, _, specs = rerun(montar, totais, meses, args.max_fornecedores)
+        montagem = envio = 0
+        for _ in range(args.reruns):
+            tempo_montagem, tempo_envio, _ = rerun(montar, totais, meses, args.max_fornecedores)
+            montagem += tempo_montagem
+            envio += tempo_envio
+        montagem, envio = montagem / args.reruns * 1000, envio / args.reruns * 1000
+        print(f"{nome:<24} {montagem:>14.1f} {envio:>11.1f} {montagem + envio:>11.1f}")
+
+        if referencia is None:
+            referencia = dados(specs)
+        assert dados(specs) == referencia, f"figuras diferentes em {nome}"
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Compara `pd.read_excel` + normalização com a leitura em streaming de leitura.py.
+
+Uso: python benchmark_leitura.py [--linhas 100000] [--arquivo planilha.xlsx]
+
+Sem --arquivo, gera uma planilha sintética com o layout da planilha real.
+"streaming" usa o motor padrão de leitura.py (calamine, se instalado) e
+"openpyxl" força o modo somente leitura do openpyxl. Cada método roda em um
+processo separado, e o pico de memória é o aumento do RSS máximo (ru_maxrss)
+durante a leitura.
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+import pandas as pd
+
+import leitura
+from gerar_planilha import escrever_planilha
+from normalizacao import normalizar_planilha
+
+
+def ler_pandas(caminho):
+    return normalizar_planilha(pd.read_excel(caminho, header=1))
+
+
+def ler_streaming(caminho):
+    return leitura.ler_planilha(caminho)
+
+
+def ler_streaming_openpyxl(caminho):
+    return leitura.ler_planilha(caminho, motor='openpyxl')
+
+
+METODOS = {'pandas': ler_pandas, 'streaming': ler_streaming, 'openpyxl': ler_streaming_openpyxl}
+
+
+def medir(metodo, caminho):
+    funcao = METODOS[metodo]
+    antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    df = funcao(caminho)
+    tempo = time.perf_counter() - inicio
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - antes
+    return tempo, pico * 1024, df[['FORNECEDOR', 'TIPO DE SERVIÇOS', 'Total']].shape
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', type=int, default=100_000)
+    parser.add_argument('--arquivo')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = args.arquivo
+        if caminho is None:
+            caminho = os.path.join(tmp, 'sintetica.xlsx')
+            print(f"Gerando planilha com {args.linhas} linhas...")
+            escrever_planilha(caminho, args.linhas)
+
+        resultados = {}
+        contexto = multiprocessing.get_context('spawn')
+        for metodo in METODOS:
+            with contexto.Pool(1) as pool:
+                resultados[metodo] = pool.apply(medir, (metodo, caminho))
+
+    print(f"{'método':<10} {'tempo (s)':>10} {'pico RSS (MB)':>14} {'formato':>14}")
+    for metodo, (tempo, pico, formato) in resultados.items():
+        print(f"{metodo:<10} {tempo:>10.2f} {pico / 1e6:>14.1f} {str(formato):>14}")
+    base = resultados['pandas']
+    for metodo in ['streaming', 'openpyxl']:
+        tempo, pico, _ = resultados[metodo]
+        print(f"{metodo}: {base[0] / tempo:.1f}x mais rápido, {base[1] / max(pico, 1):.1f}x menos memória")
+
+
+if __name__ == '__main__':
+    main()
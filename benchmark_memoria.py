@@ -0,0 +1,57 @@
+"""Mede a memória, o groupby e a exatidão das somas da planilha antes e depois de normalizacao.compactar.
+
+Uso: python benchmark_memoria.py [--linhas 100000 1000000]
+
+A planilha sintética (a mesma do benchmark_normalizacao) passa pela limpeza
+(`normalizar_planilha`) e depois pela compactação: chaves categóricas e
+valores em centavos int64. O relatório de memória é o mesmo que o app17 mostra
+na barra lateral. O groupby é o do cubo, por fornecedor e tipo de serviço; a
+soma do 'Total' em float é comparada com a soma exata dos centavos.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmark_normalizacao import planilha_bruta
+from cubo import montar_cubo
+from instrumentacao import relatorio_memoria
+from normalizacao import CENTAVOS_POR_REAL, compactar, normalizar_planilha
+
+
+def medir(funcao, *args, repeticoes=3):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao(*args)
+    return resultado, (time.perf_counter() - inicio) / repeticoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for linhas in args.linhas:
+        df = normalizar_planilha(planilha_bruta(linhas))
+        compacta, tempo_compactar = medir(compactar, df, repeticoes=1)
+        relatorio = relatorio_memoria(df, compacta)
+        print(f"\n{linhas} linhas (compactação: {tempo_compactar:.3f} s)")
+        print(relatorio.to_string(index=False, float_format=lambda mb: f"{mb:.2f}"))
+        total = relatorio.iloc[-1]
+        print(f"memória: {total['MB antes']:.1f} MB -> {total['MB depois']:.1f} MB "
+              f"({total['MB depois'] / total['MB antes']:.0%})")
+
+        cubo_antes, tempo_antes = medir(montar_cubo, df)
+        cubo_depois, tempo_depois = medir(montar_cubo, compacta)
+        print(f"cubo: {tempo_antes * 1000:.0f} ms -> {tempo_depois * 1000:.0f} ms")
+        # Os totais do cubo em reais só diferem no arredondamento da soma em float
+        assert np.allclose(cubo_antes.to_numpy(), cubo_depois.to_numpy(), rtol=1e-12)
+
+        exata = int(compacta['Total'].sum())
+        em_float = df['Total'].sum()
+        print(f"soma do Total: float {em_float:.6f} / exata {exata / CENTAVOS_POR_REAL:.2f} "
+              f"(desvio de {abs(em_float * CENTAVOS_POR_REAL - exata):.4f} centavo)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Compara a limpeza passo a passo do app17 com normalizacao.normalizar_planilha.
+
+Uso: python benchmark_normalizacao.py [--linhas 200000 500000]
+
+Mede tempo, pico de memória (tracemalloc) e quantas vezes o pico equivale ao
+tamanho do DataFrame de entrada, que é uma boa aproximação do número de cópias
+vivas ao mesmo tempo.
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from normalizacao import normalizar_planilha
+
+
+def limpeza_app17(df):
+    """Sequência de limpeza do app17, mantida aqui como referência."""
+    df = df.iloc[2:].reset_index(drop=True)
+
+    for col in ['Unnamed: 0', 'Unnamed: 6', "Unnamed: 19", 'STATUS', 'CONTRATO']:
+        if col in df.columns:
+            df = df.drop(columns=[col])
+
+    for col in ['STATUS', 'Contrato', 'Vence']:
+        if col in df.columns:
+            df = df.drop(columns=[col])
+
+    dez_cols = [col for col in df.columns if col == 'dez/25']
+    if len(dez_cols) > 1:
+        idxs = [i for i, col in enumerate(df.columns) if col == 'dez/25']
+        cols_to_drop = [df.columns[i] for i in idxs[1:]]
+        df = df.drop(columns=cols_to_drop)
+
+    nomes_meses = ['jan/25', 'fev/25', 'mar/25', 'abr/25', 'mai/25', 'jun/25',
+                   'jul/25', 'ago/25', 'set/25', 'out/25', 'nov/25', 'dez/25', 'Total']
+    col_inicio = 2
+    for i, nome_mes in enumerate(nomes_meses):
+        pos = col_inicio + i
+        if pos < len(df.columns):
+            df.rename(columns={df.columns[pos]: nome_mes}, inplace=True)
+
+    if 'TIPO DE SERVIÇOS' in df.columns:
+        df = df[df['TIPO DE SERVIÇOS'].notna() & (df['TIPO DE SERVIÇOS'].astype(str).str.strip() != "")]
+
+    for col in nomes_meses:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def planilha_bruta(linhas, seed=0):
+    """DataFrame com o mesmo formato de `pd.read_excel(..., header=1)` da planilha real."""
+    rng = np.random.default_rng(seed)
+    valores = rng.integers(0, 1_000_000, size=(linhas, 13)) / 100
+    tipos = np.array([f"Serviço {i}" for i in range(200)] + [None], dtype=object)
+    colunas = {
+        'Unnamed: 0': np.full(linhas, np.nan),
+        'TIPO DE SERVIÇOS': tipos[rng.integers(0, len(tipos), linhas)],
+        'Vence': rng.integers(1, 29, linhas),
+        'FORNECEDOR': np.array([f"Fornecedor {i}" for i in range(500)], dtype=object)[rng.integers(0, 500, linhas)],
+        'STATUS': np.array(['Em dia', 'Atrasado'], dtype=object)[rng.integers(0, 2, linhas)],
+        'Contrato': np.full(linhas, None, dtype=object),
+        'Unnamed: 6': np.full(linhas, np.nan),
+    }
+    for i in range(12):
+        # As colunas de meses chegam como object porque misturam números e textos
+        colunas[f'Unnamed: {7 + i}'] = valores[:, i].astype(object)
+    colunas['Unnamed: 19'] = np.full(linhas, np.nan)
+    colunas['Unnamed: 20'] = valores[:, 12].astype(object)
+    return pd.DataFrame(colunas)
+
+
+def medir(funcao, df):
+    # O tracemalloc deixa a execução bem mais lenta, então o tempo vem de outra rodada
+    inicio = time.perf_counter()
+    resultado = funcao(df)
+    tempo = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    funcao(df)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, tempo, pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[200_000, 500_000])
+    args = parser.parse_args()
+
+    print(f"{'linhas':>10} {'método':<14} {'tempo (s)':>10} {'pico (MB)':>10} {'pico/entrada':>13}")
+    for linhas in args.linhas:
+        df = planilha_bruta(linhas)
+        tamanho = df.memory_usage(deep=True).sum()
+        resultados = {}
+        for nome, funcao in [('app17', limpeza_app17), ('normalização', normalizar_planilha)]:
+            resultados[nome], tempo, pico = medir(funcao, df)
+            print(f"{linhas:>10} {nome:<14} {tempo:>10.3f} {pico / 1e6:>10.1f} {pico / tamanho:>13.2f}")
+        pd.testing.assert_frame_equal(resultados['app17'], resultados['normalização'])
+
+
+if __name__ == '__main__':
+    main()
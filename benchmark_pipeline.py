@@ -0,0 +1,150 @@
+"""Mede cada etapa do pipeline do app17 em planilhas sintéticas de vários tamanhos.
+
+Uso: python benchmark_pipeline.py [--linhas 1000 100000 1000000] [--fornecedores 500] [--pasta planilhas]
+
+Etapas: leitura do Excel (`pd.read_excel`), limpeza (`normalizar_planilha`
+sem conversão), conversão numérica dos meses, agregação (cubo e totais
+incrementais) e montagem das cinco figuras do app17. A leitura em streaming
+(`leitura.ler_planilha`, que o app17 usa e que faz leitura, limpeza e
+conversão numa passada só) aparece numa linha à parte.
+
+O tempo vem de uma rodada sem instrumentação; o pico de memória de cada etapa
+(tracemalloc) vem de uma segunda rodada, que pode ser pulada com
+--sem-memoria. Com --pasta, as planilhas geradas ficam guardadas e são
+reaproveitadas nas próximas execuções. A planilha de 1M de linhas leva
+minutos para ser gerada e lida pelo `pd.read_excel`; para uma rodada rápida,
+use --linhas 1000 100000.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+import plotly.graph_objects as go
+
+from agregacao_incremental import TotaisIncrementais
+from cubo import meses_do_cubo, montar_cubo, serie_para_meses
+from figuras import figura_barras, figura_linhas
+from gerar_planilha import escrever_planilha
+from leitura import ler_planilha
+from normalizacao import COLUNAS_VALORES, normalizar_planilha
+
+
+def converter_valores(df):
+    """Conversão numérica que o `normalizar_planilha` faz quando `converter=True`."""
+    df = df.copy()
+    for col in COLUNAS_VALORES:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def agregar(df):
+    cubo = montar_cubo(df)
+    return cubo, TotaisIncrementais(cubo)
+
+
+def montar_figuras(agregados):
+    """As cinco figuras do app17, sem filtros aplicados."""
+    cubo, totais = agregados
+    meses = meses_do_cubo(cubo)
+
+    fornecedor_total = totais.total_por_fornecedor().sort_values(ascending=False).reset_index()
+    fig1 = figura_barras(fornecedor_total, 'FORNECEDOR', 'Total')
+
+    df_mes = serie_para_meses(totais.total_por_mes(meses), 'Total', meses)
+    fig2 = figura_barras(df_mes, 'Mês', 'Total')
+
+    participacao = totais.participacao_por_fornecedor().sort_values('%', ascending=False)
+    fig3 = figura_barras(participacao, 'FORNECEDOR', '%', formato='percentual')
+
+    fornecedor = totais.fornecedores_ativos()[0]
+    df_fornecedor = serie_para_meses(totais.evolucao_fornecedor(fornecedor, meses), 'Despesa', meses)
+    fig4 = figura_linhas(df_fornecedor, 'Mês', 'Despesa')
+
+    df_total = serie_para_meses(totais.total_por_mes(meses), 'Despesa', meses)
+    fig5 = figura_linhas(df_total, 'Mês', 'Despesa')
+    return [fig1, fig2, fig3, fig4, fig5]
+
+
+# Cada etapa recebe a saída da anterior
+ETAPAS = [
+    ('leitura', lambda caminho: pd.read_excel(caminho, header=1)),
+    ('limpeza', lambda bruto: normalizar_planilha(bruto, converter=False)),
+    ('conversão numérica', converter_valores),
+    ('agregação', agregar),
+    ('figuras', montar_figuras),
+]
+STREAMING = ('leitura em streaming', ler_planilha)
+
+
+def rodar(caminho, medir_memoria):
+    """Executa o pipeline e devolve [(etapa, segundos ou pico em bytes)]."""
+    resultados = []
+    entrada = caminho
+    for nome, funcao in ETAPAS + [STREAMING]:
+        if nome == STREAMING[0]:
+            # A leitura em streaming recomeça do arquivo
+            entrada = caminho
+        if medir_memoria:
+            tracemalloc.reset_peak()
+            tamanho_antes = tracemalloc.get_traced_memory()[0]
+        inicio = time.perf_counter()
+        saida = funcao(entrada)
+        decorrido = time.perf_counter() - inicio
+        if medir_memoria:
+            resultados.append((nome, tracemalloc.get_traced_memory()[1] - tamanho_antes))
+        else:
+            resultados.append((nome, decorrido))
+        entrada = saida
+    return resultados
+
+
+def planilha(pasta, linhas, fornecedores):
+    caminho = os.path.join(pasta, f'sintetica_{linhas}_{fornecedores}.xlsx')
+    if not os.path.exists(caminho):
+        print(f"Gerando {caminho}...")
+        inicio = time.perf_counter()
+        escrever_planilha(caminho, linhas, fornecedores=fornecedores)
+        print(f"  {time.perf_counter() - inicio:.1f} s")
+    return caminho
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--fornecedores', type=int, default=500)
+    parser.add_argument('--pasta', help="onde guardar as planilhas geradas (padrão: diretório temporário)")
+    parser.add_argument('--sem-memoria', action='store_true', help="não faz a rodada com tracemalloc")
+    args = parser.parse_args()
+
+    # O primeiro gráfico do plotly carrega os templates; isso não entra na medição
+    go.Figure(go.Bar(x=[0], y=[0]))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pasta = args.pasta or tmp
+        os.makedirs(pasta, exist_ok=True)
+        for linhas in args.linhas:
+            caminho = planilha(pasta, linhas, args.fornecedores)
+            tempos = rodar(caminho, medir_memoria=False)
+            picos = [None] * len(tempos)
+            if not args.sem_memoria:
+                tracemalloc.start()
+                picos = [pico for _, pico in rodar(caminho, medir_memoria=True)]
+                tracemalloc.stop()
+
+            print(f"\n{linhas} linhas, {args.fornecedores} fornecedores")
+            print(f"{'etapa':<22} {'tempo (s)':>10} {'pico (MB)':>10}")
+            for (nome, tempo), pico in zip(tempos, picos):
+                if nome == STREAMING[0]:
+                    print(f"{'-' * 44}")
+                memoria = '-' if pico is None else f"{pico / 1e6:.1f}"
+                print(f"{nome:<22} {tempo:>10.3f} {memoria:>10}")
+            total = sum(tempo for nome, tempo in tempos if nome != STREAMING[0])
+            print(f"{'total (read_excel)':<22} {total:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Compara o cálculo e a coloração de vencimentos linha a linha com o módulo vencimentos.
+
+Uso: python benchmark_vencimentos.py [--contratos 10000 100000] [--linhas-estilo 1000 5000]
+
+Datas: os dois `.apply` do app02/app03 contra `proximo_vencimento`. Os dias
+vão de 1 a 28, porque o `.apply` original quebra com dias que o mês não tem;
+com eles, o resultado tem de ser idêntico. A referência é meia-noite, para o
+vencimento no próprio dia não ir para o mês seguinte no método antigo.
+
+Cores: o `df.astype(str)` com `cor_linha` por linha do app05/app06 contra
+`classificar_vencimentos` com `estilos_das_linhas`, medindo até o
+`Styler._compute()`, que o `st.dataframe` chama antes de enviar a tabela.
+"""
+import argparse
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from vencimentos import classificar_vencimentos, estilos_das_linhas, proximo_vencimento
+
+
+def vencimento_apply(dias, hoje):
+    """Cálculo usado no app02/app03 antes do módulo vencimentos."""
+    datas = dias.apply(
+        lambda dia: datetime(hoje.year, hoje.month, int(dia)) if not pd.isna(dia) and 1 <= dia <= 31 else pd.NaT
+    )
+    return datas.apply(lambda d: d + pd.DateOffset(months=1) if pd.notna(d) and d < hoje else d)
+
+
+def cor_linha(row):
+    """Cor por linha usada no app05/app06 antes do módulo vencimentos."""
+    try:
+        dia_venc = int(row['Vence'])
+    except:
+        return 'background-color: white'
+
+    hoje = pd.Timestamp.now().day
+    if dia_venc == hoje:
+        return 'background-color: orange'
+    elif dia_venc < hoje:
+        return 'background-color: red; color: white'
+    else:
+        return 'background-color: green; color: white'
+
+
+def estilo_apply(df):
+    df = df.astype(str)
+    estilo = df.style.apply(lambda x: [cor_linha(x)] * len(df.columns), axis=1)
+    estilo._compute()
+
+
+def estilo_vetorizado(df):
+    situacao = classificar_vencimentos(df['Vence'])
+    estilo = df.style.apply(estilos_das_linhas, situacao=situacao, axis=None)
+    estilo._compute()
+
+
+def tabela_vencimentos(linhas, rng):
+    return pd.DataFrame({
+        'Tipo de Serviço': 'Link dedicado',
+        'Descrição': [f"Contrato {i}" for i in range(linhas)],
+        'Vence': rng.integers(1, 32, linhas),
+        'Fornecedor': 'Fornecedor',
+        'Status': 'Em dia',
+    })
+
+
+def medir(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--contratos', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--linhas-estilo', type=int, nargs='+', default=[1_000, 5_000])
+    args = parser.parse_args()
+
+    hoje = pd.Timestamp.now().normalize().to_pydatetime()
+    rng = np.random.default_rng(0)
+    print(f"{'contratos':>10} {'apply (s)':>10} {'vetorizado (s)':>15} {'ganho':>7}")
+    for quantidade in args.contratos:
+        dias = pd.Series(rng.integers(1, 29, quantidade).astype('float64'))
+        dias[rng.random(quantidade) < 0.05] = np.nan
+
+        esperado, tempo_antigo = medir(vencimento_apply, dias, hoje)
+        obtido, tempo_novo = medir(proximo_vencimento, dias, hoje)
+
+        pd.testing.assert_series_equal(pd.to_datetime(esperado).astype('datetime64[ns]'), obtido, check_names=False)
+        print(f"{quantidade:>10} {tempo_antigo:>10.3f} {tempo_novo:>15.4f} {tempo_antigo / tempo_novo:>6.0f}x")
+
+    print(f"\n{'linhas':>10} {'cor_linha (s)':>14} {'vetorizado (s)':>15} {'ganho':>7}")
+    for linhas in args.linhas_estilo:
+        df = tabela_vencimentos(linhas, rng)
+        _, tempo_antigo = medir(estilo_apply, df)
+        _, tempo_novo = medir(estilo_vetorizado, df)
+        print(f"{linhas:>10} {tempo_antigo:>14.3f} {tempo_novo:>15.3f} {tempo_antigo / tempo_novo:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Busca por palavras-chave sem acento nem maiúsculas em fornecedor, serviço e descrição.
+
+O `df[col].str.lower().str.contains(palavra)` relê e converte todas as linhas a
+cada tecla, e "servico" não encontra "serviço". Aqui o índice é montado uma
+vez por planilha: cada coluna é fatorada (um código por linha, um texto por
+valor distinto), só os valores distintos são normalizados (sem acento, em
+minúsculas) e quebrados em palavras, e o vocabulário de palavras fica
+ordenado.
+
+Cada palavra de um termo é procurada como trecho das palavras do vocabulário,
+como no `contains` ("serv" acha "servico" e "servidor"; "net" acha
+"internet"), numa varredura só das palavras distintas, não das linhas. Os
+valores distintos que têm todas as palavras do termo, em qualquer ordem,
+viram as linhas por uma indexação dos códigos. As linhas encontradas
+são conjuntos de posições (máscaras booleanas), combinados com & | ~ para
+incluir e excluir termos.
+"""
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+PALAVRA = re.compile(r'\w+')
+# Vírgula separa termos; espaço separa palavras de um mesmo termo
+SEPARADOR_TERMOS = ','
+
+
+def normalizar(texto):
+    """Texto sem acentos e em minúsculas ("Serviço" -> "servico")."""
+    decomposto = unicodedata.normalize('NFKD', str(texto))
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def termos(texto):
+    """Termos de uma busca digitada: cada termo é a lista das suas palavras normalizadas."""
+    termos_ = [PALAVRA.findall(normalizar(parte)) for parte in texto.split(SEPARADOR_TERMOS)]
+    return [palavras for palavras in termos_ if palavras]
+
+
+class IndiceBusca:
+    """Índice de palavras das colunas de texto de um DataFrame, por posição de linha."""
+
+    def __init__(self, df, colunas):
+        self.linhas = len(df)
+        self.colunas = [c for c in colunas if c in df.columns]
+        self._codigos = []
+        ocorrencias = {}
+        for i, coluna in enumerate(self.colunas):
+            codigos, valores = pd.factorize(df[coluna])
+            self._codigos.append(codigos)
+            for j, valor in enumerate(valores):
+                for palavra in set(PALAVRA.findall(normalizar(valor))):
+                    ocorrencias.setdefault(palavra, []).append((i, j))
+        self._tamanhos = [int(c.max()) + 1 if len(c) else 0 for c in self._codigos]
+
+        # Vocabulário ordenado; as ocorrências de cada palavra ficam na mesma ordem
+        self.vocabulario = np.array(sorted(ocorrencias), dtype=str)
+        self._ocorrencias = [np.array(ocorrencias[p], dtype='int64').reshape(-1, 2) for p in self.vocabulario]
+
+    def _valores_da_palavra(self, trecho):
+        """Por coluna, máscara dos valores distintos com alguma palavra que contém `trecho`.
+
+        Cada máscara tem uma posição a mais, sempre False, onde cai o código -1 (valor ausente).
+        """
+        valores = [np.zeros(tamanho + 1, dtype=bool) for tamanho in self._tamanhos]
+        palavras = np.flatnonzero(np.char.find(self.vocabulario, trecho) >= 0)
+        if len(palavras):
+            ocorrencias = np.concatenate([self._ocorrencias[k] for k in palavras])
+            for i, mascara in enumerate(valores):
+                mascara[ocorrencias[ocorrencias[:, 0] == i, 1]] = True
+        return valores
+
+    def linhas_do_termo(self, palavras):
+        """Máscara das linhas em que uma mesma coluna tem todas as `palavras` (como trechos de palavras)."""
+        por_coluna = None
+        for palavra in palavras:
+            valores = self._valores_da_palavra(palavra)
+            por_coluna = valores if por_coluna is None else [a & b for a, b in zip(por_coluna, valores)]
+        mascara = np.zeros(self.linhas, dtype=bool)
+        for codigos, valores in zip(self._codigos, por_coluna):
+            if valores.any():
+                mascara |= valores[codigos]
+        return mascara
+
+    def filtrar(self, incluir='', excluir=''):
+        """Máscara das linhas com todos os termos de `incluir` e nenhum de `excluir`.
+
+        Os termos vêm separados por vírgula, como o usuário digita.
+        """
+        mascara = np.ones(self.linhas, dtype=bool)
+        for palavras in termos(incluir):
+            mascara &= self.linhas_do_termo(palavras)
+        for palavras in termos(excluir):
+            mascara &= ~self.linhas_do_termo(palavras)
+        return mascara
@@ -0,0 +1,126 @@
+"""Cubo de agregados fornecedor × tipo de serviço × mês.
+
+O cubo é montado uma vez por planilha: uma linha por par (FORNECEDOR,
+TIPO DE SERVIÇOS) e uma coluna por mês, mais o Total. Todos os gráficos e
+filtros dos dashboards são respondidos fatiando o cubo, cujo tamanho depende
+do número de pares e não do número de linhas da planilha.
+"""
+import numpy as np
+import pandas as pd
+
+from normalizacao import COLUNAS_VALORES, NOMES_MESES, valores_em_reais
+
+CHAVES = ['FORNECEDOR', 'TIPO DE SERVIÇOS']
+ROTULO_OUTROS = 'Outros'
+
+
+def montar_cubo(df):
+    """Soma os meses e o Total por fornecedor e tipo de serviço.
+
+    Linhas sem fornecedor também entram no cubo (com chave NaN), porque os
+    totais por mês dos dashboards sempre as consideraram. Com a planilha
+    compactada (`normalizacao.compactar`), a soma é feita em centavos inteiros,
+    exata, e só o cubo volta para reais.
+    """
+    faltando = [col for col in CHAVES if col not in df.columns]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias não encontradas: {', '.join(faltando)}")
+    valores = [col for col in COLUNAS_VALORES if col in df.columns]
+    return valores_em_reais(df.groupby(CHAVES, sort=False, dropna=False, observed=True)[valores].sum())
+
+
+def meses_do_cubo(cubo):
+    return [m for m in NOMES_MESES if m in cubo.columns]
+
+
+def fornecedores_do_cubo(cubo):
+    """Fornecedores na ordem em que aparecem na planilha."""
+    return cubo.index.get_level_values('FORNECEDOR').dropna().unique().tolist()
+
+
+def tipos_do_cubo(cubo):
+    return cubo.index.get_level_values('TIPO DE SERVIÇOS').dropna().unique().tolist()
+
+
+def filtrar_cubo(cubo, fornecedores_excluir=(), tipos=None):
+    """Remove fornecedores e, se `tipos` for dado, mantém só esses tipos de serviço."""
+    mascara = ~cubo.index.get_level_values('FORNECEDOR').isin(list(fornecedores_excluir))
+    if tipos is not None:
+        mascara &= cubo.index.get_level_values('TIPO DE SERVIÇOS').isin(list(tipos))
+    return cubo[mascara]
+
+
+def total_por_fornecedor(cubo, coluna='Total'):
+    return cubo.groupby(level='FORNECEDOR', sort=False)[coluna].sum()
+
+
+def participacao_por_fornecedor(cubo):
+    """Total por fornecedor e percentual sobre o total geral."""
+    fornecedor_total = total_por_fornecedor(cubo).reset_index()
+    fornecedor_total['%'] = fornecedor_total['Total'] / fornecedor_total['Total'].sum() * 100
+    return fornecedor_total
+
+
+def total_por_mes(cubo, meses=None):
+    """Série com a soma de cada mês, na ordem de `meses`."""
+    meses = meses_do_cubo(cubo) if meses is None else meses
+    return cubo[meses].sum()
+
+
+def evolucao_fornecedor(cubo, fornecedor, meses=None):
+    """Despesa mensal de um fornecedor, somando todos os seus tipos de serviço."""
+    meses = meses_do_cubo(cubo) if meses is None else meses
+    linhas = cubo.index.get_level_values('FORNECEDOR') == fornecedor
+    return cubo.loc[linhas, meses].sum()
+
+
+def evolucao_tipo(cubo, tipo, meses=None):
+    """Despesa mensal de um tipo de serviço, somando todos os fornecedores."""
+    meses = meses_do_cubo(cubo) if meses is None else meses
+    linhas = cubo.index.get_level_values('TIPO DE SERVIÇOS') == tipo
+    return cubo.loc[linhas, meses].sum()
+
+
+def serie_para_meses(serie, coluna_valor, meses):
+    """Converte uma série indexada por mês no DataFrame usado pelos gráficos."""
+    df = serie.rename_axis('Mês').reset_index(name=coluna_valor)
+    df['Mês'] = pd.Categorical(df['Mês'], categories=meses, ordered=True)
+    return df.sort_values('Mês')
+
+
+def posicoes_maiores(valores, n):
+    """Posições dos `n` maiores valores, do maior para o menor.
+
+    Usa seleção parcial (argpartition, O(len)) e só ordena os `n` escolhidos.
+    """
+    valores = np.asarray(valores, dtype='float64')
+    if n >= len(valores):
+        return np.argsort(-valores, kind='stable')
+    escolhidos = np.argpartition(-valores, n - 1)[:n]
+    return escolhidos[np.argsort(-valores[escolhidos], kind='stable')]
+
+
+def agrupar_outros(serie, n, rotulo=ROTULO_OUTROS):
+    """Os `n` maiores valores da série, do maior para o menor, e o resto somado em `rotulo`.
+
+    Com `n` itens ou menos, devolve a série inteira ordenada, como antes.
+    """
+    if len(serie) <= n:
+        return serie.sort_values(ascending=False)
+    posicoes = posicoes_maiores(serie.to_numpy(), n)
+    resto = np.ones(len(serie), dtype=bool)
+    resto[posicoes] = False
+    outros = pd.Series([serie.to_numpy()[resto].sum()], index=pd.Index([rotulo], name=serie.index.name))
+    return pd.concat([serie.iloc[posicoes], outros]).rename(serie.name)
+
+
+def agrupar_outros_linhas(df, n, rotulo=ROTULO_OUTROS):
+    """Mantém as `n` linhas de maior soma (na ordem original) e soma as demais numa linha `rotulo`."""
+    if len(df) <= n:
+        return df
+    posicoes = np.sort(posicoes_maiores(df.sum(axis=1).to_numpy(), n))
+    resto = np.ones(len(df), dtype=bool)
+    resto[posicoes] = False
+    outros = pd.DataFrame([df.to_numpy()[resto].sum(axis=0)], columns=df.columns,
+                          index=pd.Index([rotulo], name=df.index.name))
+    return pd.concat([df.iloc[posicoes], outros])
@@ -0,0 +1,155 @@
+"""Exportação dos dados tratados em Excel, CSV, CSV compactado e Parquet.
+
+Todo formato é gravado num arquivo temporário em disco e lido de volta uma vez
+só: em memória fica apenas uma cópia dos bytes finais. Os botões de download
+recebem uma função em vez dos bytes, então o arquivo só é gerado quando alguém
+clica, e fica em cache pela impressão digital dos dados e dos filtros.
+
+No Excel, o `df.to_excel` num `BytesIO` monta a planilha inteira em memória
+pelo openpyxl. Aqui as linhas vão para o arquivo em blocos, pelo xlsxwriter em
+modo `constant_memory` (ou pelo openpyxl em modo somente escrita, sem o
+xlsxwriter). O `df.to_excel` com o xlsxwriter não serve para isso: o pandas
+escreve coluna por coluna, e o modo `constant_memory` só aceita escrever linha
+por linha.
+"""
+import functools
+import gzip
+import hashlib
+import os
+import tempfile
+
+import pandas as pd
+import streamlit as st
+from openpyxl import Workbook
+
+from snapshot import PARQUET_DISPONIVEL
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Formato: (extensão, tipo MIME)
+FORMATOS = {
+    'Excel': ('.xlsx', MIME_XLSX),
+    'CSV': ('.csv', 'text/csv'),
+    'CSV compactado (gzip)': ('.csv.gz', 'application/gzip'),
+    'Parquet': ('.parquet', 'application/vnd.apache.parquet'),
+}
+
+# Linhas convertidas para objetos Python de cada vez
+BLOCO = 10_000
+
+
+def _linhas(df, bloco=BLOCO):
+    """Linhas de `df` como listas de valores Python, com None no lugar de NaN/NaT."""
+    for inicio in range(0, len(df), bloco):
+        parte = df.iloc[inicio:inicio + bloco]
+        yield from parte.astype(object).where(parte.notna(), None).to_numpy().tolist()
+
+
+def _escrever_xlsxwriter(df, caminho, aba):
+    wb = xlsxwriter.Workbook(caminho, {'constant_memory': True, 'default_date_format': 'dd/mm/yyyy'})
+    ws = wb.add_worksheet(aba)
+    ws.write_row(0, 0, [str(c) for c in df.columns], wb.add_format({'bold': True}))
+    for i, linha in enumerate(_linhas(df), start=1):
+        ws.write_row(i, 0, linha)
+    wb.close()
+
+
+def _escrever_openpyxl(df, caminho, aba):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(aba)
+    ws.append([str(c) for c in df.columns])
+    for linha in _linhas(df):
+        ws.append(linha)
+    wb.save(caminho)
+
+
+def escrever_excel(df, caminho, aba='Tratado'):
+    """Grava `df` (sem o índice) em `caminho`, linha por linha."""
+    if xlsxwriter is not None:
+        _escrever_xlsxwriter(df, caminho, aba)
+    else:
+        _escrever_openpyxl(df, caminho, aba)
+    return caminho
+
+
+def _colunas_para_parquet(df):
+    """Colunas object com tipos misturados (número e texto) viram texto; o Arrow não as aceita."""
+    convertidas = {}
+    for col in df.columns:
+        if df[col].dtype == object:
+            tipo = pd.api.types.infer_dtype(df[col], skipna=True)
+            if tipo == 'mixed-integer-float':
+                convertidas[col] = pd.to_numeric(df[col], errors='coerce')
+            elif tipo.startswith('mixed'):
+                convertidas[col] = df[col].astype('str')
+    return df.assign(**convertidas) if convertidas else df
+
+
+def _escrever_csv_gzip(df, caminho):
+    # Sem nome de arquivo nem data no cabeçalho do gzip: o mesmo conteúdo gera sempre os mesmos bytes.
+    # O nível 6 (o padrão da linha de comando) comprime quase como o 9, em bem menos tempo.
+    with open(caminho, 'wb') as arquivo, \
+            gzip.GzipFile(filename='', mode='wb', fileobj=arquivo, compresslevel=6, mtime=0) as saida:
+        df.to_csv(saida, index=False, encoding='utf-8')
+
+
+_ESCRITORES = {
+    'Excel': escrever_excel,
+    'CSV': lambda df, caminho: df.to_csv(caminho, index=False, encoding='utf-8'),
+    'CSV compactado (gzip)': _escrever_csv_gzip,
+    'Parquet': lambda df, caminho: _colunas_para_parquet(df).to_parquet(caminho, index=False, compression='zstd'),
+}
+
+
+def exportar(df, formato, **opcoes):
+    """Conteúdo de `df` no `formato` (uma chave de FORMATOS), gerado em disco e lido de volta uma vez só."""
+    descritor, caminho = tempfile.mkstemp(suffix=FORMATOS[formato][0])
+    os.close(descritor)
+    try:
+        _ESCRITORES[formato](df, caminho, **opcoes)
+        with open(caminho, 'rb') as arquivo:
+            return arquivo.read()
+    finally:
+        os.remove(caminho)
+
+
+def excel_em_bytes(df, aba='Tratado'):
+    return exportar(df, 'Excel', aba=aba)
+
+
+def impressao_digital(df, *filtros):
+    """Hash dos dados de `df` e dos `filtros`, para indexar o cache das exportações."""
+    hash_ = hashlib.sha256(pd.util.hash_pandas_object(df).to_numpy().tobytes())
+    hash_.update(repr((list(df.columns), filtros)).encode())
+    return hash_.hexdigest()
+
+
+# O cache_resource guarda uma cópia dos bytes; o cache_data devolveria outra a cada chamada
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _exportacao_guardada(impressao, formato, _df):
+    return exportar(_df, formato)
+
+
+def formatos_disponiveis():
+    return [f for f in ['CSV', 'CSV compactado (gzip)', 'Parquet'] if f != 'Parquet' or PARQUET_DISPONIVEL]
+
+
+def botoes_exportacao(df, nome_base, impressao=None, formatos=None, chave='exportacao'):
+    """Um botão de download por formato; cada arquivo só é gerado no clique.
+
+    `impressao` identifica os dados e os filtros (uma tupla com o hash do
+    arquivo enviado e os valores dos filtros, por exemplo); sem ela, vem de
+    `impressao_digital(df)`, que lê os dados inteiros.
+    """
+    formatos = formatos or formatos_disponiveis()
+    impressao = impressao or impressao_digital(df)
+    for coluna, formato in zip(st.columns(len(formatos)), formatos):
+        extensao, mime = FORMATOS[formato]
+        gerar = functools.partial(_exportacao_guardada, impressao, formato, df)
+        coluna.download_button(f"Exportar {formato}", data=gerar, file_name=nome_base + extensao, mime=mime,
+                               key=f'{chave}_{extensao}')
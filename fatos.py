@@ -0,0 +1,141 @@
+"""Tabela de fatos em formato longo: uma linha por fornecedor, serviço e mês.
+
+As planilhas chegam largas, com uma coluna por mês ('jan/25' ... 'dez/25'),
+o que prende cada DataFrame a um único ano. Aqui cada planilha normalizada
+vira linhas (FORNECEDOR, TIPO DE SERVIÇOS, Data, Valor), com as chaves como
+categorias e a data como datetime. Fatos de vários anos e de várias planilhas
+são empilhados numa tabela só, e as visões mensais e anuais são groupbys
+sobre ela.
+"""
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from normalizacao import NOMES_MESES
+
+MESES_ABREVIADOS = ['jan', 'fev', 'mar', 'abr', 'mai', 'jun',
+                    'jul', 'ago', 'set', 'out', 'nov', 'dez']
+CHAVES_FATOS = ['FORNECEDOR', 'TIPO DE SERVIÇOS']
+COLUNAS_FATOS = CHAVES_FATOS + ['Data', 'Valor']
+
+
+def data_do_rotulo(rotulo):
+    """'jan/25' -> Timestamp('2025-01-01')."""
+    mes, ano = rotulo.split('/')
+    return pd.Timestamp(year=2000 + int(ano), month=MESES_ABREVIADOS.index(mes) + 1, day=1)
+
+
+def rotulo_da_data(data):
+    """Timestamp('2025-01-01') -> 'jan/25'."""
+    return f"{MESES_ABREVIADOS[data.month - 1]}/{data.year % 100:02d}"
+
+
+def datas_das_colunas(df):
+    """Data de cada coluna de mês do DataFrame largo.
+
+    Usa as datas lidas da própria planilha (`df.attrs['datas']`, preenchido
+    por `leitura.ler_planilha`) e, na falta delas, o rótulo da coluna.
+    """
+    lidas = df.attrs.get('datas', {})
+    return {col: pd.Timestamp(lidas[col]) if col in lidas else data_do_rotulo(col)
+            for col in NOMES_MESES if col in df.columns}
+
+
+def montar_fatos(df, datas=None, origem=None):
+    """Converte o DataFrame largo normalizado na tabela de fatos.
+
+    `datas` mapeia cada coluna de mês para a sua data (padrão:
+    `datas_das_colunas`). O 'Total' não entra, porque é a soma dos meses.
+    Meses sem valor (NaN) são descartados. O resultado sai ordenado por data,
+    então cada mês é um trecho contíguo da tabela. Com `origem` (nome da
+    planilha, por exemplo), ganha uma coluna categórica ORIGEM.
+    """
+    datas = datas_das_colunas(df) if datas is None else datas
+    colunas = list(datas)
+    linhas = len(df)
+    valores = df[colunas].to_numpy(dtype='float64').T.ravel()
+    presentes = ~np.isnan(valores)
+
+    fatos = {}
+    for chave in CHAVES_FATOS:
+        categorias = pd.Categorical(df[chave])
+        # Os códigos se repetem mês a mês; as categorias são montadas uma vez só
+        codigos = np.tile(categorias.codes, len(colunas))[presentes]
+        fatos[chave] = pd.Categorical.from_codes(codigos, categories=categorias.categories)
+    fatos['Data'] = np.repeat(np.array([datas[c] for c in colunas], dtype='datetime64[ns]'), linhas)[presentes]
+    fatos['Valor'] = valores[presentes]
+    if origem is not None:
+        fatos['ORIGEM'] = pd.Categorical([origem]).repeat(int(presentes.sum()))
+    return pd.DataFrame(fatos)
+
+
+def concatenar_fatos(lista_fatos):
+    """Empilha tabelas de fatos de várias planilhas ou anos, mantendo as categorias.
+
+    O `pd.concat` transformaria em object as categóricas com categorias
+    diferentes; aqui as categorias são unidas antes.
+    """
+    lista_fatos = list(lista_fatos)
+    if not lista_fatos:
+        tipos = {'Data': 'datetime64[ns]', 'Valor': 'float64'}
+        return pd.DataFrame({col: pd.Series(dtype=tipos.get(col, 'category')) for col in COLUNAS_FATOS})
+    colunas = list(lista_fatos[0].columns)
+    fatos = {}
+    for col in colunas:
+        partes = [f[col] for f in lista_fatos]
+        if isinstance(partes[0].dtype, pd.CategoricalDtype):
+            fatos[col] = union_categoricals(partes, ignore_order=True)
+        else:
+            fatos[col] = np.concatenate([p.to_numpy() for p in partes])
+    juntos = pd.DataFrame(fatos)
+    ordem = np.argsort(juntos['Data'].to_numpy(), kind='stable')
+    return juntos.take(ordem).reset_index(drop=True)
+
+
+def fatos_das_abas(planilhas, origem=None):
+    """Fatos das abas lidas por `leitura.ler_abas`, cada uma com as próprias datas.
+
+    Uma aba por ano funciona: os meses de cada aba viram as datas dela. Com
+    mais de uma aba, a ORIGEM leva também o nome da aba ('arquivo · aba').
+    """
+    if len(planilhas) == 1:
+        return montar_fatos(next(iter(planilhas.values())), origem=origem)
+    return concatenar_fatos([montar_fatos(df, origem=aba if origem is None else f"{origem} · {aba}")
+                             for aba, df in planilhas.items()])
+
+
+def dimensao_datas(fatos):
+    """Dimensão de datas: ano, mês, trimestre e rótulo de cada data dos fatos."""
+    datas = pd.DatetimeIndex(np.unique(fatos['Data'].to_numpy()), name='Data')
+    rotulos = [rotulo_da_data(d) for d in datas]
+    return pd.DataFrame({
+        'Ano': datas.year,
+        'Mês': datas.month,
+        'Trimestre': datas.quarter,
+        'Rótulo': pd.Categorical(rotulos, categories=rotulos, ordered=True),
+    }, index=datas)
+
+
+def total_mensal(fatos, por=()):
+    """Soma por mês (e pelas colunas de `por`), na ordem das datas."""
+    return fatos.groupby(['Data', *por], observed=True)['Valor'].sum()
+
+
+def total_anual(fatos, por=()):
+    """Soma por ano (e pelas colunas de `por`)."""
+    ano = fatos['Data'].dt.year.rename('Ano')
+    return fatos.groupby([ano, *[fatos[c] for c in por]], observed=True)['Valor'].sum()
+
+
+def comparar_anos(fatos):
+    """Tabela mês × ano com a despesa total, para comparar os anos lado a lado."""
+    return meses_por_ano(total_mensal(fatos))
+
+
+def meses_por_ano(mensal):
+    """Tabela mês × ano de uma soma mensal indexada por data (de `total_mensal`)."""
+    datas = mensal.index
+    tabela = pd.DataFrame({'Mês': datas.month, 'Ano': datas.year, 'Valor': mensal.to_numpy()})
+    tabela = tabela.pivot_table(index='Mês', columns='Ano', values='Valor', aggfunc='sum')
+    tabela.index = [MESES_ABREVIADOS[m - 1] for m in tabela.index]
+    return tabela
@@ -0,0 +1,85 @@
+"""Figuras dos gráficos padrão dos dashboards, montadas direto com plotly.graph_objects.
+
+O `px.bar`/`px.line` passam os dados por um DataFrame intermediário, agrupam,
+validam cada propriedade e montam hovertemplate e legenda a cada chamada; para
+as tabelas pequenas dos gráficos (um ponto por fornecedor ou por mês) esse
+custo fixo domina o rerun. Aqui os traços são criados diretamente, com a mesma
+aparência das versões em plotly.express; as cores vêm da paleta do template
+ativo (a do tema do Streamlit, dentro do app), como no px.
+
+`figura()` guarda as figuras prontas em cache, indexadas por um hash dos dados
+agregados e das opções: um rerun que não muda o gráfico (trocar outro filtro,
+mexer na prévia) reaproveita a figura sem montá-la de novo.
+"""
+import hashlib
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from formatacao import formatar_moeda, formatar_percentual
+
+FORMATOS = {'moeda': formatar_moeda, 'percentual': formatar_percentual}
+
+
+def _rotulo(coluna, rotulos):
+    return (rotulos or {}).get(coluna, coluna)
+
+
+def _dica(campos):
+    """Hovertemplate no formato do plotly.express: 'nome=valor' em linhas."""
+    return '<br>'.join(f'{nome}={valor}' for nome, valor in campos) + '<extra></extra>'
+
+
+def figura_barras(df, x, y, formato='moeda', rotulos=None):
+    """Barras verticais com o valor formatado acima de cada barra."""
+    rotulo_x, rotulo_y = _rotulo(x, rotulos), _rotulo(y, rotulos)
+    barras = go.Bar(x=df[x].to_numpy(), y=df[y].to_numpy(), text=FORMATOS[formato](df[y]).to_numpy(),
+                    textposition='outside', showlegend=False, name='',
+                    hovertemplate=_dica([(rotulo_x, '%{x}'), (rotulo_y, '%{y}'), ('text', '%{text}')]))
+    fig = go.Figure(barras)
+    fig.update_layout(xaxis_title=rotulo_x, yaxis_title=rotulo_y, barmode='relative', margin=dict(t=60))
+    return fig
+
+
+def figura_linhas(df, x, y, formato='moeda', cor=None, rotulos=None, margem=None):
+    """Linhas com marcadores e o valor formatado acima de cada ponto.
+
+    Com `cor`, uma linha por valor da coluna, na ordem em que aparecem, com legenda.
+    """
+    rotulo_x, rotulo_y = _rotulo(x, rotulos), _rotulo(y, rotulos)
+    textos = FORMATOS[formato](df[y])
+    grupos = [('', df.index)] if cor is None else df.groupby(cor, sort=False, observed=True).groups.items()
+    tracos = []
+    for nome, indices in grupos:
+        campos = [(rotulo_x, '%{x}'), (rotulo_y, '%{y}'), ('text', '%{text}')]
+        if cor is not None:
+            campos.insert(0, (_rotulo(cor, rotulos), nome))
+        tracos.append(go.Scatter(
+            x=df.loc[indices, x].to_numpy(), y=df.loc[indices, y].to_numpy(), text=textos.loc[indices].to_numpy(),
+            mode='lines+markers+text', textposition='top center', name=str(nome), legendgroup=str(nome),
+            showlegend=cor is not None, hovertemplate=_dica(campos)))
+    fig = go.Figure(tracos)
+    fig.update_layout(xaxis_title=rotulo_x, yaxis_title=rotulo_y, margin=margem or dict(t=60))
+    if cor is not None:
+        fig.update_layout(legend_title_text=_rotulo(cor, rotulos))
+    return fig
+
+
+def chave_figura(nome, df, opcoes):
+    """Hash dos dados (valores, índice e colunas) e das opções de uma figura."""
+    hash_ = hashlib.sha256(nome.encode())
+    hash_.update(pd.util.hash_pandas_object(df).to_numpy().tobytes())
+    hash_.update(repr((list(df.columns), sorted(opcoes.items()))).encode())
+    return hash_.hexdigest()
+
+
+# A figura guardada é compartilhada entre sessões; o st.plotly_chart só a lê
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _figura_guardada(chave, _montar, _df, _opcoes):
+    return _montar(_df, **_opcoes)
+
+
+def figura(montar, df, **opcoes):
+    """`montar(df, **opcoes)`, reaproveitada enquanto os dados e as opções forem os mesmos."""
+    return _figura_guardada(chave_figura(montar.__name__, df, opcoes), montar, df, opcoes)
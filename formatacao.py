@@ -0,0 +1,33 @@
+"""Formatação de valores em reais e percentuais no padrão pt-BR.
+
+Reúne num lugar só o `.apply(lambda x: f"R$ {x:,.2f}".replace(...))` que cada
+dashboard repetia nos rótulos dos gráficos. São poucos valores por gráfico (um
+por barra ou ponto), então um f-string por valor basta.
+"""
+import numpy as np
+import pandas as pd
+
+# Troca os separadores do f-string (1,234.56) pelos do pt-BR (1.234,56)
+_PONTO_VIRGULA = str.maketrans(',.', '.,')
+
+
+def _formatar(valores, formato):
+    """Aplica `formato` a cada valor e devolve no mesmo formato da entrada: Series (mesmo índice), array ou str."""
+    if isinstance(valores, pd.Series):
+        return valores.astype('float64').map(formato).astype('str')
+    if np.ndim(valores) == 0:
+        return formato(float(valores))
+    return np.array([formato(x) for x in np.asarray(valores, dtype='float64').ravel()], dtype=object)
+
+
+def formatar_moeda(valores, prefixo='R$ '):
+    """Formata valores como 'R$ 1.234,56', igual ao lambda usado nos dashboards.
+
+    Aceita Series, arrays, listas ou um número; NaN vira 'R$ nan', como antes.
+    """
+    return _formatar(valores, lambda x: prefixo + f"{x:,.2f}".translate(_PONTO_VIRGULA))
+
+
+def formatar_percentual(valores, casas=1):
+    """Formata percentuais como '12,5%' (vírgula decimal, padrão pt-BR)."""
+    return _formatar(valores, lambda x: f"{x:.{casas}f}".replace('.', ',') + '%')
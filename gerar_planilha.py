@@ -0,0 +1,139 @@
+"""Gera planilhas sintéticas com o layout da despesas_ti.xlsx, no tamanho que se quiser.
+
+Uso: python gerar_planilha.py SAIDA.xlsx [--linhas 100000] [--fornecedores 500] [--tipos 200] [--ano 2025] [--abas 1]
+
+O layout segue a planilha real: linha de datas acima do cabeçalho (com a coluna
+de dezembro repetida no fim, como a coluna espúria que os apps descartam como
+'Unnamed: 19'), cabeçalho com FORNECEDOR / TIPO DE SERVIÇOS e as colunas
+'Unnamed' de espaçamento, duas linhas de apresentação, algumas linhas sem tipo
+de serviço e a linha 'Total' no fim. Os fornecedores seguem uma distribuição
+concentrada (poucos fornecedores respondem pela maior parte das linhas).
+
+Usa o xlsxwriter quando instalado (cerca de duas vezes mais rápido); sem ele,
+o openpyxl em modo somente escrita.
+"""
+import argparse
+import datetime
+import time
+
+import numpy as np
+from openpyxl import Workbook
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+STATUS = ['Em dia', 'Vencido', 'A vencer', None]
+
+
+def linhas_planilha(linhas, fornecedores=500, tipos=200, ano=2025, seed=0):
+    """Gera as linhas da planilha, do topo (A1) até a linha 'Total'."""
+    rng = np.random.default_rng(seed)
+    meses = [datetime.datetime(ano, m, 1) for m in range(1, 13)]
+    yield [None] * 6 + ['Type'] + meses + [meses[-1], 'Total']
+    yield [None, 'TIPO DE SERVIÇOS', 'Vence', 'FORNECEDOR', 'STATUS', 'Contrato'] + [None] * 15
+    # Linhas de apresentação: uma em branco e uma de título
+    yield [None] * 21
+    yield [None, 'Despesas de TI', None, None, None, None] + [None] * 15
+
+    # Pesos 1/k: o fornecedor mais frequente aparece k vezes mais que o k-ésimo
+    pesos = 1 / np.arange(1, fornecedores + 1)
+    fornecedor = rng.choice(fornecedores, size=linhas, p=pesos / pesos.sum())
+    tipo = rng.integers(0, tipos, linhas)
+    sem_tipo = rng.random(linhas) < 0.01
+    vence = rng.integers(1, 29, linhas)
+    status = rng.integers(0, len(STATUS), linhas)
+    totais = np.zeros(12)
+    bloco = 10_000
+    for inicio in range(0, linhas, bloco):
+        fim = min(inicio + bloco, linhas)
+        valores = np.round(rng.uniform(0, 10_000, size=(fim - inicio, 12)), 2)
+        # Meses ainda não lançados ficam zerados, como no fim do ano na planilha real
+        valores[rng.random(fim - inicio) < 0.3, 6:] = 0
+        totais += valores.sum(axis=0)
+        for i, meses_linha in zip(range(inicio, fim), valores.tolist()):
+            yield [None, None if sem_tipo[i] else f'Serviço {tipo[i]}', int(vence[i]),
+                   f'Fornecedor {fornecedor[i]}', STATUS[status[i]], None, None] \
+                + meses_linha + [None, round(sum(meses_linha), 2)]
+    yield [None, 'Total', None, None, None, None, None] + np.round(totais, 2).tolist() + [None, round(totais.sum(), 2)]
+
+
+def _escrever_xlsxwriter(caminho, abas):
+    wb = xlsxwriter.Workbook(caminho, {'constant_memory': True})
+    formato_data = wb.add_format({'num_format': 'mmm/yy'})
+    for nome, linhas in abas:
+        ws = wb.add_worksheet(nome)
+        # Só a primeira linha tem datas, que precisam de formato para o Excel reconhecê-las
+        for j, valor in enumerate(next(linhas)):
+            if isinstance(valor, datetime.datetime):
+                ws.write_datetime(0, j, valor, formato_data)
+            elif valor is not None:
+                ws.write(0, j, valor)
+        for i, linha in enumerate(linhas, start=1):
+            ws.write_row(i, 0, linha)
+    wb.close()
+
+
+def _escrever_openpyxl(caminho, abas):
+    wb = Workbook(write_only=True)
+    for nome, linhas in abas:
+        ws = wb.create_sheet(nome)
+        for linha in linhas:
+            ws.append(linha)
+    wb.save(caminho)
+
+
+def linhas_resumo(abas):
+    """Aba de resumo sem o layout de despesas, como as que o financeiro põe no início da pasta."""
+    yield ['Resumo por centro de custo']
+    yield ['Centro de custo', 'Observação']
+    for nome in abas:
+        yield [nome, None]
+
+
+def escrever_planilha(caminho, linhas, fornecedores=500, tipos=200, ano=2025, seed=0, motor=None, abas=1):
+    """Grava uma planilha sintética com `linhas` linhas de despesas.
+
+    `motor` pode ser 'xlsxwriter' ou 'openpyxl'; sem ele, usa o xlsxwriter
+    quando instalado. Com `abas` maior que 1, cada aba é um centro de custo com
+    `linhas` linhas (e uma semente própria), depois de uma aba 'Resumo' sem o
+    layout de despesas.
+    """
+    if motor is None:
+        motor = 'xlsxwriter' if xlsxwriter is not None else 'openpyxl'
+    if abas == 1:
+        conteudo = [('Despesas', linhas_planilha(linhas, fornecedores, tipos, ano, seed))]
+    else:
+        nomes = [f'Centro de custo {i + 1}' for i in range(abas)]
+        conteudo = [('Resumo', linhas_resumo(nomes))] + [
+            (nome, linhas_planilha(linhas, fornecedores, tipos, ano, seed + i)) for i, nome in enumerate(nomes)]
+    if motor == 'xlsxwriter':
+        if xlsxwriter is None:
+            raise ImportError("O motor 'xlsxwriter' precisa do pacote xlsxwriter")
+        _escrever_xlsxwriter(caminho, conteudo)
+    else:
+        _escrever_openpyxl(caminho, conteudo)
+    return caminho
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('saida')
+    parser.add_argument('--linhas', type=int, default=100_000)
+    parser.add_argument('--fornecedores', type=int, default=500, help="quantidade de fornecedores distintos")
+    parser.add_argument('--tipos', type=int, default=200, help="quantidade de tipos de serviço distintos")
+    parser.add_argument('--ano', type=int, default=2025)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--motor', choices=['xlsxwriter', 'openpyxl'])
+    parser.add_argument('--abas', type=int, default=1, help="abas de centro de custo, com --linhas linhas cada")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    escrever_planilha(args.saida, args.linhas, args.fornecedores, args.tipos, args.ano, args.seed, args.motor,
+                      args.abas)
+    print(f"{args.saida}: {args.abas} aba(s) de {args.linhas} linhas em {time.perf_counter() - inicio:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
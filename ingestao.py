@@ -0,0 +1,122 @@
+"""Processamento de planilhas grandes numa thread, com progresso e cancelamento.
+
+Ler e tratar uma planilha de centenas de milhares de linhas leva segundos, e
+dentro do script do Streamlit a página fica parada até o fim. Aqui o
+processamento roda numa thread: o script só inicia a `Ingestao`, guarda-a no
+`st.session_state` e desenha um painel (um `st.fragment` que se redesenha
+sozinho) com a etapa atual, as linhas lidas e um botão de cancelar. O resto
+da página continua respondendo. Ao terminar, o painel pede um rerun do app,
+que encontra o resultado pronto.
+
+O cancelamento só marca um evento: a thread o confere a cada aviso de
+progresso e abandona a planilha pela metade na próxima checagem, sem que a
+sessão precise esperar por ela.
+"""
+import threading
+import time
+
+import streamlit as st
+
+# Intervalo entre os redesenhos do painel de progresso
+INTERVALO_PAINEL = 0.5
+
+
+class IngestaoCancelada(Exception):
+    """Levantada dentro da thread quando o usuário cancela o processamento."""
+
+
+class Ingestao:
+    """Uma planilha sendo processada numa thread: etapa, linhas lidas, resultado ou erro."""
+
+    def __init__(self, chave, nome, processar):
+        """`processar(ingestao)` faz o trabalho, chamando `ingestao.avisar(...)` ao longo dele."""
+        self.chave = chave
+        self.nome = nome
+        self.etapa = "Iniciando"
+        self.linhas = 0
+        self.total = 0
+        self.unidade = "linhas"
+        self.erro = None
+        self.inicio = None
+        self.fim = None
+        self._processar = processar
+        self._cancelar = threading.Event()
+        self._thread = threading.Thread(target=self._rodar, name=f"ingestao-{chave[:12]}", daemon=True)
+
+    def iniciar(self):
+        self.inicio = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def _rodar(self):
+        try:
+            self._processar(self)
+            self.etapa = "Concluída"
+        except IngestaoCancelada:
+            self.etapa = "Cancelada"
+        except Exception as e:
+            self.erro = e
+            self.etapa = "Erro"
+        finally:
+            self.fim = time.perf_counter()
+
+    def avisar(self, etapa=None, linhas=None, total=None):
+        """Atualiza o progresso; é aqui que a thread percebe o cancelamento."""
+        if self._cancelar.is_set():
+            raise IngestaoCancelada()
+        if etapa is not None:
+            self.etapa = etapa
+        if linhas is not None:
+            self.linhas = linhas
+        if total is not None:
+            self.total = total
+
+    def progresso_da_leitura(self, linhas, total):
+        """Callback no formato do `progresso` de `leitura.ler_planilha`."""
+        self.unidade = "linhas"
+        self.avisar("Lendo a planilha", linhas, total)
+
+    def progresso_das_abas(self, abas, total):
+        """Callback no formato do `progresso` de `leitura.ler_abas`."""
+        self.unidade = "abas"
+        self.avisar("Lendo as abas", abas, total)
+
+    def cancelar(self):
+        self._cancelar.set()
+
+    @property
+    def cancelada(self):
+        return self._cancelar.is_set()
+
+    @property
+    def terminada(self):
+        return self.fim is not None
+
+    @property
+    def fracao(self):
+        return min(self.linhas / self.total, 1.0) if self.total else 0.0
+
+    @property
+    def segundos(self):
+        if self.inicio is None:
+            return 0.0
+        return (self.fim or time.perf_counter()) - self.inicio
+
+
+@st.fragment(run_every=INTERVALO_PAINEL)
+def painel_ingestao(chave_estado='ingestao'):
+    """Progresso da ingestão guardada em `st.session_state[chave_estado]`, com o botão de cancelar."""
+    ingestao = st.session_state.get(chave_estado)
+    if ingestao is None or ingestao.cancelada:
+        return
+    if ingestao.terminada:
+        # O resultado (ou o erro) é tratado pelo script inteiro
+        st.rerun()
+
+    texto = f"{ingestao.nome} · {ingestao.etapa}"
+    if ingestao.total:
+        texto += f" · {ingestao.linhas:,} de {ingestao.total:,} {ingestao.unidade}".replace(',', '.')
+    st.progress(ingestao.fracao, text=f"{texto} · {ingestao.segundos:.0f} s")
+    if st.button("Cancelar", key=f'{chave_estado}_cancelar'):
+        ingestao.cancelar()
+        st.rerun()
@@ -0,0 +1,134 @@
+"""Medição opcional do tempo e da memória de cada etapa do dashboard.
+
+Cada rerun do Streamlit registra, por etapa (leitura, cubo, filtros, cada
+gráfico...), o tempo de relógio e a variação da memória residente do processo.
+Os registros da sessão ficam num objeto guardado no `st.session_state`, que
+também calcula percentis móveis por etapa, e podem ser gravados num log JSON
+Lines ou exportados em CSV/JSON. Na memória ficam só os registros mais
+recentes (`MAX_REGISTROS`): numa sessão longa, o histórico completo é o do
+log. Desligada, a medição não custa nada além de um `if`. O
+`relatorio_memoria` compara, coluna a coluna, a memória de uma planilha antes
+e depois de compactada.
+"""
+import collections
+import contextlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+DIRETORIO_LOGS = 'logs'
+ARQUIVO_LOG = os.path.join(DIRETORIO_LOGS, 'instrumentacao.jsonl')
+
+# Quantas medições recentes de cada etapa entram nos percentis
+JANELA = 200
+# Quantos registros a sessão guarda na memória; o histórico completo fica no log
+MAX_REGISTROS = 10_000
+
+
+def memoria_residente():
+    """Memória residente (RSS) atual do processo, em bytes, ou None sem leitura.
+
+    No Linux vem de /proc/self/statm; nos outros Unix, cai para o pico do
+    getrusage, que só cresce (a variação por etapa fica subestimada). No
+    Windows não há o módulo `resource`, e a memória fica sem medir.
+    """
+    if sys.platform.startswith('linux'):
+        try:
+            with open('/proc/self/statm') as arquivo:
+                return int(arquivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError):
+            pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # O ru_maxrss vem em KB no Linux e em bytes no macOS
+    return pico if sys.platform == 'darwin' else pico * 1024
+
+
+def relatorio_memoria(antes, depois):
+    """Memória de cada coluna (em MB, contando o texto das strings) e o tipo, antes e depois de uma conversão."""
+    memoria_antes = antes.memory_usage(deep=True, index=False)
+    memoria_depois = depois.memory_usage(deep=True, index=False).reindex(memoria_antes.index)
+    relatorio = pd.DataFrame({
+        'coluna': memoria_antes.index.astype(str),
+        'tipo antes': antes.dtypes.astype(str).to_numpy(),
+        'MB antes': memoria_antes.to_numpy() / 1e6,
+        'tipo depois': depois.dtypes.reindex(memoria_antes.index).astype(str).to_numpy(),
+        'MB depois': memoria_depois.to_numpy() / 1e6,
+    })
+    total = {'coluna': 'Todas as colunas', 'tipo antes': '', 'MB antes': relatorio['MB antes'].sum(),
+             'tipo depois': '', 'MB depois': relatorio['MB depois'].sum()}
+    return pd.concat([relatorio, pd.DataFrame([total])], ignore_index=True)
+
+
+class Instrumentacao:
+    """Registros de tempo e memória por etapa, acumulados ao longo da sessão."""
+
+    def __init__(self, janela=JANELA, max_registros=MAX_REGISTROS):
+        self.ativa = False
+        self.rerun = 0
+        self.registros = collections.deque(maxlen=max_registros)
+        self._recentes = collections.defaultdict(lambda: collections.deque(maxlen=janela))
+
+    def novo_rerun(self, ativa):
+        """Marca o início de um rerun; `ativa` vem do controle na barra lateral."""
+        self.ativa = ativa
+        if ativa:
+            self.rerun += 1
+
+    @contextlib.contextmanager
+    def etapa(self, nome):
+        """Mede o bloco `with` como a etapa `nome` do rerun atual."""
+        if not self.ativa:
+            yield
+            return
+        memoria_antes = memoria_residente()
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicio
+            memoria_depois = memoria_residente()
+            registro = {
+                'rerun': self.rerun,
+                'instante': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'etapa': nome,
+                'segundos': segundos,
+                'memoria_mb': (None if memoria_antes is None or memoria_depois is None
+                               else (memoria_depois - memoria_antes) / 1e6),
+            }
+            self.registros.append(registro)
+            self._recentes[nome].append(segundos)
+
+    def do_rerun(self, rerun=None):
+        """Registros de um rerun (padrão: o atual)."""
+        rerun = self.rerun if rerun is None else rerun
+        return [r for r in self.registros if r['rerun'] == rerun]
+
+    def percentis(self, quantis=(50, 90, 99)):
+        """Percentis móveis do tempo de cada etapa, sobre as últimas medições."""
+        linhas = []
+        for nome, tempos in self._recentes.items():
+            valores = np.percentile(np.fromiter(tempos, dtype='float64'), quantis)
+            linhas.append({'etapa': nome, 'medições': len(tempos),
+                           **{f'p{q} (s)': v for q, v in zip(quantis, valores)}})
+        return pd.DataFrame(linhas)
+
+    def tabela(self):
+        return pd.DataFrame(self.registros, columns=['rerun', 'instante', 'etapa', 'segundos', 'memoria_mb'])
+
+    def gravar_log(self, caminho=ARQUIVO_LOG):
+        """Acrescenta os registros do rerun atual ao log JSON Lines."""
+        registros = self.do_rerun()
+        if not registros:
+            return
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        with open(caminho, 'a', encoding='utf-8') as arquivo:
+            for registro in registros:
+                arquivo.write(json.dumps(registro, ensure_ascii=False) + '\n')
@@ -0,0 +1,331 @@
+"""Leitura em streaming das planilhas de despesas.
+
+Em vez de carregar a aba inteira com `pd.read_excel`, percorre as linhas uma a
+uma, pula as linhas de apresentação e guarda só as colunas usadas pelos
+dashboards (FORNECEDOR, TIPO DE SERVIÇOS, meses e Total). O resultado é igual
+ao de `normalizar_planilha(pd.read_excel(...))` restrito a essas colunas.
+
+Usa o python-calamine quando instalado (bem mais rápido); sem ele, ou com
+`motor='openpyxl'`, usa o openpyxl em modo somente leitura.
+
+Pastas de trabalho com uma aba por centro de custo ou por ano são lidas por
+`ler_abas`: cada aba com o layout de despesas é lida num processo separado
+(ou no próprio processo, em arquivos pequenos), e `concatenar_abas` empilha o
+resultado com a coluna ABA.
+"""
+import concurrent.futures
+import datetime
+import io
+import itertools
+import multiprocessing
+import os
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from normalizacao import (COLUNAS_DESCARTADAS, COLUNAS_VALORES, LINHAS_APRESENTACAO,
+                          planejar_colunas)
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+COLUNAS_TEXTO = ['TIPO DE SERVIÇOS', 'FORNECEDOR']
+
+# De quantas em quantas linhas o `progresso` da leitura é chamado
+INTERVALO_PROGRESSO = 5_000
+
+# Coluna que identifica a aba de origem quando a pasta de trabalho tem várias
+COLUNA_ABA = 'ABA'
+
+# Abaixo deste tamanho de arquivo (uns 90 mil linhas no total), `ler_abas` lê
+# as abas uma a uma: a partida do pool leva perto de 1 s, mais do que se ganha
+TAMANHO_MINIMO_PARALELO = 10_000_000
+
+
+class LayoutInvalido(ValueError):
+    """A aba não tem o cabeçalho das planilhas de despesas."""
+
+
+class DatasDivergentes(ValueError):
+    """Abas com as mesmas colunas de mês em datas diferentes (por exemplo, uma aba por ano)."""
+
+
+def rotulos_pandas(cabecalho):
+    """Reproduz os nomes de coluna que o `pd.read_excel` daria para o cabeçalho."""
+    rotulos = []
+    vistos = {}
+    for i, valor in enumerate(cabecalho):
+        rotulo = f'Unnamed: {i}' if valor is None or valor == '' else valor
+        if rotulo in vistos:
+            # Colunas repetidas viram 'nome.1', 'nome.2'... como no pandas
+            base = rotulo
+            while rotulo in vistos:
+                vistos[base] += 1
+                rotulo = f'{base}.{vistos[base]}'
+        vistos[rotulo] = 0
+        rotulos.append(rotulo)
+    return rotulos
+
+
+def _linhas_calamine(arquivo, aba):
+    """Número de linhas e iterador das linhas da aba (a partir de A1), via calamine."""
+    if isinstance(arquivo, (str, bytes)) or hasattr(arquivo, '__fspath__'):
+        wb = CalamineWorkbook.from_path(arquivo)
+    else:
+        wb = CalamineWorkbook.from_filelike(arquivo)
+    ws = wb.get_sheet_by_index(aba) if isinstance(aba, int) else wb.get_sheet_by_name(aba)
+
+    def gerar():
+        if ws.start is None:
+            return
+        linha_inicio, coluna_inicio = ws.start
+        prefixo = (None,) * coluna_inicio
+        for _ in range(linha_inicio):
+            yield ()
+        for linha in ws.iter_rows():
+            yield prefixo + tuple(linha)
+
+    return ws.total_height, gerar()
+
+
+def _linhas_openpyxl(arquivo, aba):
+    """Número de linhas e iterador das linhas da aba (a partir de A1), via openpyxl."""
+    wb = load_workbook(arquivo, read_only=True, data_only=True)
+    ws = wb.worksheets[aba] if isinstance(aba, int) else wb[aba]
+
+    def gerar():
+        try:
+            yield from ws.iter_rows(values_only=True)
+        finally:
+            wb.close()
+
+    return ws.max_row or 0, gerar()
+
+
+def iterar_linhas(arquivo, aba=0, motor=None):
+    """Número de linhas e iterador das linhas da aba.
+
+    `motor` pode ser 'calamine' ou 'openpyxl'; sem ele, usa o calamine quando
+    instalado. O calamine é muito mais rápido, mas carrega a aba inteira em
+    memória nativa; o openpyxl lê de fato linha a linha e usa menos memória.
+    """
+    if motor is None:
+        motor = 'calamine' if CalamineWorkbook is not None else 'openpyxl'
+    if motor == 'calamine':
+        if CalamineWorkbook is None:
+            raise ImportError("O motor 'calamine' precisa do pacote python-calamine")
+        return _linhas_calamine(arquivo, aba)
+    return _linhas_openpyxl(arquivo, aba)
+
+
+def _vazio(valor):
+    return valor is None or str(valor).strip() == ""
+
+
+def _numero(valor):
+    """Converte uma célula para float como o `pd.to_numeric(errors='coerce')`."""
+    if isinstance(valor, (int, float)):
+        return valor
+    if isinstance(valor, str):
+        try:
+            return float(valor)
+        except ValueError:
+            return np.nan
+    return np.nan
+
+
+def ler_planilha(arquivo, aba=0, linha_cabecalho=1, col_inicio=2, descartar=COLUNAS_DESCARTADAS,
+                 nomes=COLUNAS_VALORES, linhas_apresentacao=LINHAS_APRESENTACAO, motor=None, progresso=None):
+    """Lê a aba em streaming e devolve o DataFrame já normalizado.
+
+    `arquivo` pode ser um caminho ou um arquivo aberto (como o do
+    `st.file_uploader`) e `aba`, o índice ou o nome da aba; `motor` segue
+    `iterar_linhas`. Linhas sem 'TIPO DE SERVIÇOS' são descartadas durante a
+    leitura.
+
+    As datas que a planilha traz na linha logo acima do cabeçalho (o mês real
+    de cada coluna) ficam em `df.attrs['datas']`, como {coluna: 'AAAA-MM-DD'}.
+
+    `progresso(linhas_lidas, total_de_linhas)` é chamado a cada
+    INTERVALO_PROGRESSO linhas e no fim; uma exceção levantada por ele
+    interrompe a leitura.
+    """
+    altura, linhas = iterar_linhas(arquivo, aba, motor)
+    acima = ()
+    for _ in range(linha_cabecalho):
+        acima = tuple(next(linhas, None) or ())
+    cabecalho = tuple(next(linhas, None) or ())
+
+    # Abas sem dimensão gravada trazem linhas de larguras diferentes: o
+    # cabeçalho é completado até a largura das primeiras linhas, como no pandas
+    primeiras = list(itertools.islice(linhas, linhas_apresentacao + 1))
+    largura_total = max([len(cabecalho)] + [len(linha) for linha in primeiras])
+    cabecalho += (None,) * (largura_total - len(cabecalho))
+    linhas = itertools.chain(primeiras, linhas)
+
+    posicoes, finais = planejar_colunas(rotulos_pandas(cabecalho), col_inicio, descartar, nomes)
+    usadas = [(pos, nome) for pos, nome in zip(posicoes, finais)
+              if nome in COLUNAS_TEXTO or nome in nomes]
+    if not any(nome == 'TIPO DE SERVIÇOS' for _, nome in usadas):
+        raise LayoutInvalido("Coluna 'TIPO DE SERVIÇOS' não encontrada no cabeçalho")
+    pos_tipo = next(pos for pos, nome in usadas if nome == 'TIPO DE SERVIÇOS')
+    largura = max(pos for pos, _ in usadas) + 1
+
+    # Os valores vão direto para arrays pré-alocados (crescem se a estimativa
+    # de linhas não bastar), sem guardar um objeto Python por célula
+    numericas = [(j, pos) for j, (pos, nome) in enumerate(usadas) if nome in nomes]
+    textos = [(j, pos) for j, (pos, nome) in enumerate(usadas) if nome not in nomes]
+    capacidade = max(altura, 1024)
+    valores = np.full((len(numericas), capacidade), np.nan)
+    objetos = np.empty((len(textos), capacidade), dtype=object)
+    indice = np.empty(capacidade, dtype=np.int64)
+
+    k = 0
+    for n, linha in enumerate(linhas):
+        if progresso is not None and n % INTERVALO_PROGRESSO == 0:
+            progresso(n, altura)
+        if n < linhas_apresentacao:
+            continue
+        if len(linha) < largura:
+            linha = linha + (None,) * (largura - len(linha))
+        if _vazio(linha[pos_tipo]):
+            continue
+        if k == capacidade:
+            capacidade *= 2
+            valores = np.concatenate([valores, np.full_like(valores, np.nan)], axis=1)
+            objetos = np.concatenate([objetos, np.empty_like(objetos)], axis=1)
+            indice = np.resize(indice, capacidade)
+        indice[k] = n - linhas_apresentacao
+        for i, (_, pos) in enumerate(numericas):
+            valores[i, k] = _numero(linha[pos])
+        for i, (_, pos) in enumerate(textos):
+            valor = linha[pos]
+            # O calamine devolve '' nas células vazias; o pandas usaria NaN
+            objetos[i, k] = None if valor == '' else valor
+        k += 1
+
+    if progresso is not None:
+        progresso(altura, altura)
+
+    df = pd.DataFrame(valores[:, :k].T, index=indice[:k], columns=[j for j, _ in numericas])
+    for i, (j, _) in enumerate(textos):
+        df.insert(j, j, pd.Series(objetos[i, :k], index=df.index))
+    df.columns = [nome for _, nome in usadas]
+    # Em texto ISO, para sobreviver ao snapshot Parquet (que grava os attrs em JSON)
+    df.attrs['datas'] = {nome: pd.Timestamp(acima[pos]).strftime('%Y-%m-%d') for pos, nome in usadas
+                         if pos < len(acima) and isinstance(acima[pos], datetime.date)}
+    return df
+
+
+def nomes_das_abas(arquivo):
+    """Nomes das abas, na ordem da pasta de trabalho, sem carregar nenhuma delas."""
+    if CalamineWorkbook is not None:
+        if isinstance(arquivo, (str, bytes)) or hasattr(arquivo, '__fspath__'):
+            return CalamineWorkbook.from_path(arquivo).sheet_names
+        return CalamineWorkbook.from_filelike(arquivo).sheet_names
+    wb = load_workbook(arquivo, read_only=True)
+    try:
+        return wb.sheetnames
+    finally:
+        wb.close()
+
+
+def _ler_aba(arquivo, aba, opcoes):
+    """Lê uma aba num processo do pool; None se ela não tiver o layout de despesas."""
+    if isinstance(arquivo, bytes):
+        arquivo = io.BytesIO(arquivo)
+    try:
+        return ler_planilha(arquivo, aba=aba, **opcoes)
+    except LayoutInvalido:
+        return None
+
+
+def _contexto_processos():
+    # O fork de um servidor com threads (como o do Streamlit) pode herdar travas
+    # presas; o forkserver parte de um processo limpo que já importou este módulo,
+    # e os processos saem dele sem reimportar o pandas
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        contexto = multiprocessing.get_context('forkserver')
+        contexto.set_forkserver_preload([__name__])
+        return contexto
+    return multiprocessing.get_context('spawn')
+
+
+def ler_abas(arquivo, abas=None, processos=None, progresso=None, tamanho_minimo=TAMANHO_MINIMO_PARALELO,
+             **opcoes):
+    """Lê as abas com o layout de despesas (em paralelo, se compensar) e devolve {aba: DataFrame}.
+
+    `abas` limita as abas tentadas (padrão: todas); as que não têm o cabeçalho
+    de despesas são ignoradas. Cada aba é lida e normalizada por
+    `ler_planilha` (com as `opcoes`) num processo próprio, até `processos` de
+    cada vez (padrão: um por aba, até o número de CPUs), então o tempo total
+    fica perto do da aba mais lenta. `progresso(abas_lidas, total_de_abas)` é
+    chamado a cada aba concluída.
+
+    O paralelo só compensa com várias CPUs e abas grandes: o pool custa perto
+    de 1 s para subir, e a leitura anda a uns 5 MB/s de xlsx. Arquivos menores
+    que `tamanho_minimo` bytes são lidos aba por aba, no próprio processo.
+    """
+    if hasattr(arquivo, 'read'):
+        arquivo.seek(0)
+        arquivo = arquivo.read()
+    abas = list(abas) if abas is not None else nomes_das_abas(
+        io.BytesIO(arquivo) if isinstance(arquivo, bytes) else arquivo)
+    tamanho = len(arquivo) if isinstance(arquivo, bytes) else os.path.getsize(arquivo)
+    processos = min(processos or os.cpu_count() or 1, len(abas)) if tamanho >= tamanho_minimo else 1
+
+    if processos <= 1:
+        lidas = {}
+        for i, aba in enumerate(abas):
+            lidas[aba] = _ler_aba(arquivo, aba, opcoes)
+            if progresso is not None:
+                progresso(i + 1, len(abas))
+    else:
+        pool = concurrent.futures.ProcessPoolExecutor(processos, mp_context=_contexto_processos())
+        try:
+            futuros = {pool.submit(_ler_aba, arquivo, aba, opcoes): aba for aba in abas}
+            lidas = {}
+            for i, futuro in enumerate(concurrent.futures.as_completed(futuros)):
+                lidas[futuros[futuro]] = futuro.result()
+                if progresso is not None:
+                    progresso(i + 1, len(abas))
+        except BaseException:
+            # Erro numa aba ou cancelamento pelo `progresso`: as abas ainda na fila nem começam
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        pool.shutdown()
+
+    planilhas = {aba: lidas[aba] for aba in abas if lidas[aba] is not None}
+    if not planilhas:
+        raise LayoutInvalido("Nenhuma aba com a coluna 'TIPO DE SERVIÇOS' no cabeçalho")
+    return planilhas
+
+
+def concatenar_abas(planilhas):
+    """Empilha as abas lidas por `ler_abas` numa planilha só, com a coluna ABA.
+
+    Uma aba só volta como está, igual à de `ler_planilha`. No formato largo,
+    os meses de anos diferentes cairiam na mesma coluna: se duas abas leram
+    datas diferentes para o mesmo mês (`attrs['datas']`), levanta
+    `DatasDivergentes`. Essas abas vão para a tabela de fatos uma a uma
+    (`fatos.fatos_das_abas`).
+    """
+    if len(planilhas) == 1:
+        return next(iter(planilhas.values()))
+    datas = {}
+    origem = {}
+    for aba, df in planilhas.items():
+        for coluna, data in df.attrs.get('datas', {}).items():
+            if datas.setdefault(coluna, data) != data:
+                raise DatasDivergentes(
+                    f"As abas '{origem[coluna]}' e '{aba}' têm o mês {coluna} em datas diferentes "
+                    f"({datas[coluna]} e {data})")
+            origem.setdefault(coluna, aba)
+    partes = [df.assign(**{COLUNA_ABA: aba}) for aba, df in planilhas.items()]
+    juntas = pd.concat(partes, ignore_index=True)
+    juntas.insert(0, COLUNA_ABA, pd.Categorical(juntas.pop(COLUNA_ABA), categories=list(planilhas)))
+    juntas.attrs = {'datas': datas} if datas else {}
+    return juntas
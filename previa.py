@@ -0,0 +1,107 @@
+"""Prévia paginada da planilha: busca, ordenação e fatiamento feitos no servidor.
+
+O `st.dataframe(df)` manda o DataFrame inteiro para o navegador a cada rerun.
+Aqui só a página visível é enviada; a busca por coluna e a ordenação rodam no
+pandas, e o total de linhas e as somas dos valores continuam refletindo todas
+as linhas encontradas, não só a página.
+
+Filtros e busca viram uma máscara de linhas sobre a planilha inteira, que nunca
+é copiada: só a página é tirada dela, pelas posições, e as somas usam a
+máscara direto no `np.sum`.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from formatacao import formatar_moeda
+from normalizacao import COLUNAS_VALORES, colunas_em_centavos, valores_em_reais
+
+TAMANHOS_PAGINA = [25, 50, 100, 500]
+TODAS_AS_COLUNAS = "Todas as colunas de texto"
+
+
+def contar(df, linhas=None):
+    return len(df) if linhas is None else int(np.count_nonzero(linhas))
+
+
+def buscar(df, texto, coluna=None, linhas=None):
+    """Máscara das linhas em que `coluna` (ou qualquer coluna de texto) contém `texto`, sem diferenciar maiúsculas.
+
+    `linhas` (máscara) limita a busca às linhas já filtradas. Sem texto nem
+    `linhas`, devolve None: todas as linhas.
+    """
+    texto = texto.strip()
+    if not texto:
+        return linhas
+    colunas = [coluna] if coluna else [c for c in df.columns if c not in COLUNAS_VALORES]
+    mascara = np.zeros(len(df), dtype=bool)
+    for col in colunas:
+        mascara |= df[col].astype(str).str.contains(texto, case=False, regex=False).to_numpy()
+    return mascara if linhas is None else mascara & linhas
+
+
+def pagina_da_tabela(df, numero=1, tamanho=50, ordenar_por=None, crescente=True, linhas=None):
+    """Fatia da página `numero` (a partir de 1) e o total de páginas.
+
+    Com `linhas` (máscara), a página sai só das linhas marcadas. Para ordenar,
+    só a coluna de ordenação é ordenada; a página é tirada do DataFrame pelas
+    posições, sem reordenar as outras colunas inteiras.
+    """
+    posicoes = None if linhas is None else np.flatnonzero(linhas)
+    total_paginas = max(1, -(-contar(df, linhas) // tamanho))
+    numero = min(max(numero, 1), total_paginas)
+    inicio = (numero - 1) * tamanho
+    if ordenar_por is None:
+        if posicoes is None:
+            return df.iloc[inicio:inicio + tamanho], total_paginas
+        return df.iloc[posicoes[inicio:inicio + tamanho]], total_paginas
+    chave = df[ordenar_por] if posicoes is None else df[ordenar_por].take(posicoes)
+    ordem = chave.reset_index(drop=True).sort_values(ascending=crescente, na_position='last', kind='stable').index
+    ordem = ordem.to_numpy()[inicio:inicio + tamanho]
+    return df.iloc[ordem if posicoes is None else posicoes[ordem]], total_paginas
+
+
+def somas(df, linhas=None):
+    """Soma de cada coluna de valores (só das `linhas` marcadas, se dadas), formatada em reais."""
+    colunas = [c for c in COLUNAS_VALORES if c in df.columns]
+    if linhas is None:
+        soma = df[colunas].sum()
+    else:
+        soma = pd.Series({c: np.nansum(df[c].to_numpy(), where=linhas) for c in colunas})
+    # A soma não traz a marca das colunas em centavos; ela vem da planilha
+    soma = soma.to_frame().T
+    soma.attrs.update(df.attrs)
+    soma = valores_em_reais(soma)
+    return pd.DataFrame([formatar_moeda(soma.iloc[0]).to_numpy()], columns=colunas, index=['Soma'])
+
+
+def mostrar_previa(df, chave='previa', largura=1400, linhas=None):
+    """Desenha a prévia paginada com os controles de busca, ordenação e página.
+
+    `linhas` é a máscara das linhas que passaram pelos filtros do dashboard.
+    """
+    col_busca, col_coluna, col_ordem, col_sentido, col_tamanho = st.columns([3, 2, 2, 1, 1])
+    texto = col_busca.text_input("Buscar", key=f'{chave}_busca')
+    coluna = col_coluna.selectbox("Na coluna", [TODAS_AS_COLUNAS] + list(df.columns), key=f'{chave}_coluna')
+    ordenar_por = col_ordem.selectbox("Ordenar por", ["(ordem da planilha)"] + list(df.columns), key=f'{chave}_ordem')
+    crescente = col_sentido.radio("Sentido", ["↑", "↓"], key=f'{chave}_sentido') == "↑"
+    tamanho = col_tamanho.selectbox("Linhas", TAMANHOS_PAGINA, index=1, key=f'{chave}_tamanho')
+
+    encontradas = buscar(df, texto, None if coluna == TODAS_AS_COLUNAS else coluna, linhas)
+    quantidade = contar(df, encontradas)
+    total_paginas = max(1, -(-quantidade // tamanho))
+    # Uma busca nova pode deixar a página atual além da última
+    if st.session_state.get(f'{chave}_pagina', 1) > total_paginas:
+        st.session_state[f'{chave}_pagina'] = total_paginas
+    numero = st.number_input(f"Página (de {total_paginas})", min_value=1, max_value=total_paginas,
+                             key=f'{chave}_pagina')
+    pagina, _ = pagina_da_tabela(df, numero, tamanho, None if ordenar_por == "(ordem da planilha)" else ordenar_por,
+                                 crescente, encontradas)
+
+    legenda = f"{quantidade} de {contar(df, linhas)} linhas · página {numero} de {total_paginas}"
+    if colunas_em_centavos(df):
+        # Na planilha compactada, as células de valores vazias foram guardadas como zero
+        legenda += " · valores vazios na planilha aparecem como 0,00"
+    st.caption(legenda)
+    st.dataframe(valores_em_reais(pagina), width=largura)
+    st.dataframe(somas(df, encontradas), width=largura)
@@ -0,0 +1,103 @@
+"""Processa em lote um diretório de planilhas de despesas, sem o Streamlit.
+
+Uso: python processar_lote.py PASTA [--saida snapshots] [--processos N] [--motor calamine|openpyxl]
+
+Cada planilha passa pela mesma leitura do app17 em um processo separado:
+todas as abas com o layout de despesas (`leitura.ler_abas`), empilhadas
+numa planilha só, e o resultado é gravado como snapshot Parquet, com o
+cubo fornecedor × tipo de serviço e a tabela de fatos ao lado, em
+`<saida>/agregados`. Os nomes dos snapshots usam o hash do conteúdo, como no
+upload do app17, então planilhas já processadas são puladas e os dashboards
+só leem o que foi pré-calculado aqui.
+"""
+import argparse
+import glob
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cubo import montar_cubo
+from fatos import fatos_das_abas
+from leitura import concatenar_abas, ler_abas
+from snapshot import (DIRETORIO_SNAPSHOTS, caminho_agregado, caminho_snapshot, salvar_agregado,
+                      salvar_snapshot)
+
+AGREGADOS = ['cubo', 'fatos']
+
+
+def hash_arquivo(caminho):
+    """SHA-256 do conteúdo, a mesma chave que o app17 usa para o upload."""
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(1 << 20), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def processar_planilha(caminho, saida=DIRETORIO_SNAPSHOTS, motor=None, refazer=False):
+    """Lê, normaliza e grava snapshot e agregados de uma planilha.
+
+    Roda dentro dos processos do pool; devolve um resumo para o relatório.
+    """
+    inicio = time.perf_counter()
+    nome = os.path.basename(caminho)
+    chave = hash_arquivo(caminho)
+    snapshot = caminho_snapshot(nome, chave, saida)
+    prontos = [snapshot] + [caminho_agregado(snapshot, tipo) for tipo in AGREGADOS]
+    if not refazer and all(os.path.exists(p) for p in prontos):
+        return {'planilha': nome, 'snapshot': snapshot, 'linhas': None, 'segundos': 0.0, 'situação': 'já processada'}
+
+    # As planilhas já são distribuídas entre os processos do pool; as abas de cada uma são lidas em sequência
+    planilhas = ler_abas(caminho, processos=1, motor=motor)
+    df = concatenar_abas(planilhas)
+    salvar_snapshot(df, nome, chave, saida)
+    salvar_agregado(montar_cubo(df), snapshot, 'cubo')
+    salvar_agregado(fatos_das_abas(planilhas, origem=nome), snapshot, 'fatos')
+    return {'planilha': nome, 'snapshot': snapshot, 'linhas': len(df),
+            'segundos': time.perf_counter() - inicio, 'situação': 'processada'}
+
+
+def listar_planilhas(pasta):
+    # Arquivos '~$...' são travas temporárias que o Excel deixa com a planilha aberta
+    return sorted(c for c in glob.glob(os.path.join(pasta, '*.xlsx'))
+                  if not os.path.basename(c).startswith('~$'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('pasta', help="diretório com as planilhas .xlsx")
+    parser.add_argument('--saida', default=DIRETORIO_SNAPSHOTS, help="diretório dos snapshots (padrão: %(default)s)")
+    parser.add_argument('--processos', type=int, default=os.cpu_count(), help="processos em paralelo (padrão: núcleos da máquina)")
+    parser.add_argument('--motor', choices=['calamine', 'openpyxl'], help="leitor do Excel (padrão: calamine, se instalado)")
+    parser.add_argument('--refazer', action='store_true', help="reprocessa planilhas que já têm snapshot")
+    args = parser.parse_args()
+
+    planilhas = listar_planilhas(args.pasta)
+    if not planilhas:
+        sys.exit(f"Nenhuma planilha .xlsx encontrada em {args.pasta}")
+
+    inicio = time.perf_counter()
+    falhas = 0
+    with ProcessPoolExecutor(max_workers=min(args.processos, len(planilhas))) as pool:
+        tarefas = {pool.submit(processar_planilha, caminho, args.saida, args.motor, args.refazer): caminho
+                   for caminho in planilhas}
+        for tarefa in as_completed(tarefas):
+            nome = os.path.basename(tarefas[tarefa])
+            try:
+                resumo = tarefa.result()
+            except Exception as e:
+                falhas += 1
+                print(f"ERRO {nome}: {e}", file=sys.stderr)
+                continue
+            linhas = '' if resumo['linhas'] is None else f"{resumo['linhas']} linhas, "
+            print(f"{nome}: {resumo['situação']} ({linhas}{resumo['segundos']:.1f} s) -> {resumo['snapshot']}")
+
+    print(f"{len(planilhas) - falhas} de {len(planilhas)} planilhas em {time.perf_counter() - inicio:.1f} s")
+    if falhas:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Snapshots colunares (Parquet) das planilhas já normalizadas.
+
+Depois da primeira limpeza, o DataFrame é gravado em Parquet com as colunas de
+meses tipadas como float64. Nas sessões seguintes o dashboard pode recarregar
+o último snapshot em milissegundos, sem passar pelo Excel.
+"""
+import glob
+import importlib.util
+import os
+
+import pandas as pd
+
+from normalizacao import COLUNAS_VALORES, valores_em_reais
+
+DIRETORIO_SNAPSHOTS = 'snapshots'
+# Agregados (cubo, fatos) ficam num subdiretório, fora da listagem de snapshots
+SUBDIRETORIO_AGREGADOS = 'agregados'
+
+# O pandas precisa do pyarrow ou do fastparquet para ler e gravar Parquet
+PARQUET_DISPONIVEL = any(importlib.util.find_spec(m) for m in ['pyarrow', 'fastparquet'])
+
+
+def caminho_snapshot(nome, chave, diretorio=DIRETORIO_SNAPSHOTS):
+    """Arquivo do snapshot: nome da planilha mais o início do hash do conteúdo."""
+    base = os.path.splitext(os.path.basename(nome))[0]
+    return os.path.join(diretorio, f"{base}_{chave[:12]}.parquet")
+
+
+def _gravar_parquet(df, caminho):
+    # Grava em um arquivo temporário e renomeia, para nunca deixar arquivo pela metade
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    temporario = caminho + '.tmp'
+    df.to_parquet(temporario)
+    os.replace(temporario, caminho)
+    return caminho
+
+
+def salvar_snapshot(df, nome, chave, diretorio=DIRETORIO_SNAPSHOTS):
+    """Grava o DataFrame normalizado e devolve o caminho do snapshot (valores sempre em reais)."""
+    tipos = {col: 'float64' for col in COLUNAS_VALORES if col in df.columns}
+    return _gravar_parquet(valores_em_reais(df).astype(tipos), caminho_snapshot(nome, chave, diretorio))
+
+
+def listar_snapshots(diretorio=DIRETORIO_SNAPSHOTS):
+    """Snapshots existentes, do mais recente para o mais antigo."""
+    arquivos = glob.glob(os.path.join(diretorio, '*.parquet'))
+    return sorted(arquivos, key=os.path.getmtime, reverse=True)
+
+
+def ultimo_snapshot(diretorio=DIRETORIO_SNAPSHOTS):
+    snapshots = listar_snapshots(diretorio)
+    return snapshots[0] if snapshots else None
+
+
+def carregar_snapshot(caminho):
+    return pd.read_parquet(caminho)
+
+
+def caminho_agregado(snapshot, tipo):
+    """Arquivo do agregado `tipo` ('cubo', 'fatos') que acompanha um snapshot."""
+    base = os.path.splitext(os.path.basename(snapshot))[0]
+    return os.path.join(os.path.dirname(snapshot), SUBDIRETORIO_AGREGADOS, f"{base}_{tipo}.parquet")
+
+
+def salvar_agregado(tabela, snapshot, tipo):
+    return _gravar_parquet(tabela, caminho_agregado(snapshot, tipo))
+
+
+def carregar_agregado(snapshot, tipo):
+    """Agregado pré-calculado do snapshot, ou None se ainda não existir."""
+    caminho = caminho_agregado(snapshot, tipo)
+    return pd.read_parquet(caminho) if os.path.exists(caminho) else None
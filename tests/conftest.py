@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+# Os módulos do projeto ficam soltos na raiz do repositório, sem pacote
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gerar_planilha import escrever_planilha  # noqa: E402
+from leitura import ler_planilha  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def planilha(tmp_path_factory):
+    """Planilha sintética pequena com o layout das de despesas (uma aba)."""
+    caminho = tmp_path_factory.mktemp('planilhas') / 'despesas.xlsx'
+    return escrever_planilha(str(caminho), 500, fornecedores=30, tipos=12)
+
+
+@pytest.fixture(scope='session')
+def pasta_com_abas(tmp_path_factory):
+    """Pasta de trabalho com uma aba 'Resumo' e três abas de despesas."""
+    caminho = tmp_path_factory.mktemp('planilhas') / 'abas.xlsx'
+    return escrever_planilha(str(caminho), 200, fornecedores=20, tipos=8, abas=3)
+
+
+@pytest.fixture
+def despesas(planilha):
+    """Planilha já lida e normalizada, como os dashboards a recebem."""
+    return ler_planilha(planilha)
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from agregacao_incremental import TotaisIncrementais
+from cubo import filtrar_cubo, fornecedores_do_cubo, meses_do_cubo, montar_cubo, total_por_fornecedor, total_por_mes
+from normalizacao import compactar
+
+
+@pytest.fixture
+def cubo(despesas):
+    return montar_cubo(compactar(despesas))
+
+
+def test_totais_iguais_aos_do_cubo_filtrado(cubo):
+    totais = TotaisIncrementais(cubo)
+    fornecedores = fornecedores_do_cubo(cubo)
+    meses = meses_do_cubo(cubo)
+    for excluir, selecionados in [(fornecedores[:3], meses), (fornecedores[2:5], meses[:4]),
+                                  ([], meses[6:]), (fornecedores[::2], meses)]:
+        totais.atualizar_exclusoes(excluir)
+        totais.atualizar_meses(selecionados)
+        filtrado = filtrar_cubo(cubo, excluir)
+        pd.testing.assert_series_equal(totais.total_por_mes(meses), total_por_mes(filtrado, meses),
+                                       check_names=False)
+        assert totais.total_periodo == pytest.approx(filtrado[selecionados].to_numpy().sum(), abs=1e-6)
+        esperado = total_por_fornecedor(filtrado)
+        obtido = totais.total_por_fornecedor()
+        pd.testing.assert_series_equal(obtido, esperado.loc[obtido.index], check_names=False, check_index_type=False)
+        assert set(totais.fornecedores_ativos()) == set(fornecedores) - set(excluir)
+
+
+def test_excluir_e_reincluir_volta_ao_valor_exato(cubo):
+    totais = TotaisIncrementais(cubo)
+    soma, periodo = totais.soma.copy(), totais.periodo
+    fornecedores = fornecedores_do_cubo(cubo)
+    for i in range(len(fornecedores)):
+        totais.atualizar_exclusoes(fornecedores[:i])
+    totais.atualizar_exclusoes([])
+    np.testing.assert_array_equal(totais.soma, soma)
+    assert totais.periodo == periodo
+
+
+def test_todos_os_fornecedores_excluidos(cubo):
+    totais = TotaisIncrementais(cubo)
+    meses = meses_do_cubo(cubo)
+    totais.atualizar_exclusoes(fornecedores_do_cubo(cubo))
+    assert totais.fornecedores_ativos() == []
+    assert totais.total_por_fornecedor().empty
+    assert totais.por_fornecedor_e_mes(meses).empty
+    # Só sobram as linhas sem fornecedor (na planilha gerada, a linha 'Total')
+    sem_fornecedor = cubo[cubo.index.get_level_values('FORNECEDOR').isna()]
+    pd.testing.assert_series_equal(totais.total_por_mes(meses), sem_fornecedor[meses].sum(), check_names=False)
+    # Sem fornecedor para escolher, o seletor do app devolve None
+    evolucao = totais.evolucao_fornecedor(None, meses)
+    assert evolucao.index.tolist() == meses
+    assert (evolucao == 0).all()
+
+
+def test_evolucao_de_fornecedor_excluido_continua_disponivel(cubo):
+    totais = TotaisIncrementais(cubo)
+    fornecedor = fornecedores_do_cubo(cubo)[0]
+    antes = totais.evolucao_fornecedor(fornecedor)
+    totais.atualizar_exclusoes([fornecedor])
+    pd.testing.assert_series_equal(totais.evolucao_fornecedor(fornecedor), antes)
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cubo import CHAVES, agrupar_outros, agrupar_outros_linhas, montar_cubo
+from normalizacao import COLUNAS_VALORES, compactar
+
+
+def por_chaves(cubo):
+    """Cubo com as chaves como texto e as linhas em ordem, para comparar montagens diferentes."""
+    cubo = cubo.reset_index()
+    cubo[CHAVES] = cubo[CHAVES].astype('str')
+    return cubo.sort_values(CHAVES, ignore_index=True)
+
+
+def test_cubo_igual_ao_groupby_da_planilha(despesas):
+    esperado = despesas.groupby(CHAVES, dropna=False)[COLUNAS_VALORES].sum()
+    for df in [despesas, compactar(despesas)]:
+        cubo = montar_cubo(df)
+        assert cubo.columns.tolist() == COLUNAS_VALORES
+        assert (cubo.dtypes == np.float64).all()
+        pd.testing.assert_frame_equal(por_chaves(cubo), por_chaves(esperado), rtol=1e-12)
+
+
+def test_cubo_compactado_soma_centavos_exatos(despesas):
+    # Cada soma sai como um número inteiro de centavos dividido por 100, sem resíduo
+    total = montar_cubo(compactar(despesas))['Total'].to_numpy()
+    np.testing.assert_array_equal(np.rint(total * 100) / 100, total)
+
+
+def test_cubo_mantem_linhas_sem_fornecedor():
+    df = pd.DataFrame({'FORNECEDOR': ['A', None, 'A'], 'TIPO DE SERVIÇOS': ['x', 'x', 'x'],
+                       'jan/25': [1.0, 2.0, 3.0], 'Total': [1.0, 2.0, 3.0]})
+    cubo = montar_cubo(compactar(df))
+    assert cubo['Total'].sum() == 6.0
+    assert cubo.index.get_level_values('FORNECEDOR').isna().sum() == 1
+
+
+def test_cubo_sem_coluna_obrigatoria():
+    with pytest.raises(ValueError, match='FORNECEDOR'):
+        montar_cubo(pd.DataFrame({'TIPO DE SERVIÇOS': ['x'], 'Total': [1.0]}))
+
+
+def test_agrupar_outros():
+    serie = pd.Series([5.0, 1.0, 9.0, 3.0, 7.0], index=pd.Index(list('abcde'), name='FORNECEDOR'), name='Total')
+    agrupada = agrupar_outros(serie, 2)
+    assert agrupada.index.tolist() == ['c', 'e', 'Outros']
+    assert agrupada.tolist() == [9.0, 7.0, 9.0]
+    assert agrupada.name == 'Total'
+    # Com poucos itens, só ordena
+    assert agrupar_outros(serie, 5).index.tolist() == ['c', 'e', 'a', 'd', 'b']
+
+
+def test_agrupar_outros_linhas():
+    df = pd.DataFrame({'jan/25': [1.0, 10.0, 2.0], 'fev/25': [1.0, 10.0, 5.0]},
+                      index=pd.Index(['a', 'b', 'c'], name='FORNECEDOR'))
+    agrupado = agrupar_outros_linhas(df, 2)
+    # As linhas mantidas ficam na ordem original
+    assert agrupado.index.tolist() == ['b', 'c', 'Outros']
+    assert agrupado.loc['Outros'].tolist() == [1.0, 1.0]
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from formatacao import formatar_moeda, formatar_percentual
+
+
+def moeda_lambda(x):
+    """Formatação que os dashboards usavam antes do módulo formatacao."""
+    return f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def percentual_lambda(x):
+    return f"{x:.1f}%".replace(".", ",")
+
+
+def valores_de_teste():
+    rng = np.random.default_rng(0)
+    comuns = rng.integers(-100_000, 5_000_000_000, 2_000) / 100
+    # NaN, zeros com sinal, meio centavo, infinitos e valores fora da faixa do int64
+    extremos = [np.nan, 0.0, -0.0, 0.005, -0.015, np.inf, -np.inf, 9.0e13, 1.0e16, -1.0e17,
+                9.3e18, -2.5e19, 1.0e300, np.finfo('float64').max]
+    return pd.Series(np.concatenate([comuns, extremos]), index=np.arange(7, 7 + len(comuns) + len(extremos)),
+                     name='Total')
+
+
+@pytest.mark.parametrize('formatar, referencia', [(formatar_moeda, moeda_lambda),
+                                                  (formatar_percentual, percentual_lambda)])
+def test_serie_igual_ao_lambda_dos_dashboards(formatar, referencia):
+    valores = valores_de_teste()
+    textos = formatar(valores)
+    pd.testing.assert_series_equal(textos, valores.apply(referencia), check_dtype=False)
+    assert textos.index.equals(valores.index)
+    assert textos.name == 'Total'
+
+
+def test_array_lista_e_numero():
+    assert formatar_moeda(1234567.891) == 'R$ 1.234.567,89'
+    assert formatar_moeda(-0.5, prefixo='') == '-0,50'
+    assert list(formatar_moeda(np.array([1.0, np.nan]))) == ['R$ 1,00', 'R$ nan']
+    assert list(formatar_percentual([12.345, 50], casas=2)) == ['12,35%', '50,00%']
+
+
+def test_serie_vazia():
+    assert formatar_moeda(pd.Series([], dtype='float64')).empty
@@ -0,0 +1,72 @@
+import io
+
+import pandas as pd
+import pytest
+
+from leitura import (COLUNA_ABA, DatasDivergentes, LayoutInvalido, concatenar_abas, ler_abas, ler_planilha,
+                     nomes_das_abas)
+from normalizacao import normalizar_planilha
+
+ABAS_DE_DESPESAS = ['Centro de custo 1', 'Centro de custo 2', 'Centro de custo 3']
+
+
+def test_igual_ao_read_excel_normalizado(planilha):
+    df = ler_planilha(planilha)
+    esperado = normalizar_planilha(pd.read_excel(planilha, header=1))
+    pd.testing.assert_frame_equal(df, esperado[df.columns])
+
+
+def test_motores_e_arquivo_em_memoria(planilha, despesas):
+    pd.testing.assert_frame_equal(ler_planilha(planilha, motor='openpyxl'), despesas)
+    with open(planilha, 'rb') as arquivo:
+        pd.testing.assert_frame_equal(ler_planilha(io.BytesIO(arquivo.read())), despesas)
+
+
+def test_datas_dos_meses(despesas):
+    assert despesas.attrs['datas']['jan/25'] == '2025-01-01'
+    assert len(despesas.attrs['datas']) == 12
+
+
+def test_aba_sem_layout(pasta_com_abas):
+    with pytest.raises(LayoutInvalido):
+        ler_planilha(pasta_com_abas, aba='Resumo')
+
+
+def test_ler_abas_ignora_o_resumo(pasta_com_abas):
+    assert nomes_das_abas(pasta_com_abas) == ['Resumo'] + ABAS_DE_DESPESAS
+    planilhas = ler_abas(pasta_com_abas)
+    assert list(planilhas) == ABAS_DE_DESPESAS
+    for aba, df in planilhas.items():
+        pd.testing.assert_frame_equal(df, ler_planilha(pasta_com_abas, aba=aba))
+
+
+def test_ler_abas_em_paralelo_igual_ao_sequencial(pasta_com_abas):
+    progresso = []
+    paralelo = ler_abas(pasta_com_abas, processos=2, tamanho_minimo=0,
+                        progresso=lambda lidas, total: progresso.append((lidas, total)))
+    sequencial = ler_abas(pasta_com_abas, processos=1)
+    assert list(paralelo) == list(sequencial)
+    for aba in sequencial:
+        pd.testing.assert_frame_equal(paralelo[aba], sequencial[aba])
+    assert progresso[-1] == (4, 4)
+
+
+def test_concatenar_abas(pasta_com_abas):
+    planilhas = ler_abas(pasta_com_abas)
+    juntas = concatenar_abas(planilhas)
+    assert juntas.columns[0] == COLUNA_ABA
+    assert juntas[COLUNA_ABA].cat.categories.tolist() == ABAS_DE_DESPESAS
+    assert len(juntas) == sum(len(df) for df in planilhas.values())
+    assert juntas['Total'].sum() == pytest.approx(sum(df['Total'].sum() for df in planilhas.values()))
+    # Uma aba só volta como está
+    unica = {'Despesas': planilhas['Centro de custo 1']}
+    assert concatenar_abas(unica) is planilhas['Centro de custo 1']
+
+
+def test_concatenar_abas_com_anos_diferentes():
+    aba_2024 = pd.DataFrame({'FORNECEDOR': ['A'], 'jan/25': [1.0]})
+    aba_2024.attrs['datas'] = {'jan/25': '2024-01-01'}
+    aba_2025 = pd.DataFrame({'FORNECEDOR': ['B'], 'jan/25': [2.0]})
+    aba_2025.attrs['datas'] = {'jan/25': '2025-01-01'}
+    with pytest.raises(DatasDivergentes, match="'2024' e '2025'"):
+        concatenar_abas({'2024': aba_2024, '2025': aba_2025})
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from normalizacao import (COLUNAS_VALORES, colunas_em_centavos, compactar, linhas_sem, normalizar_planilha,
+                          para_centavos, valores_em_reais)
+
+
+def planilha_bruta():
+    """Planilha como o `pd.read_excel(header=1)` a entrega: rótulos 'Unnamed' nos meses e linhas de apresentação."""
+    colunas = ['Unnamed: 0', 'TIPO DE SERVIÇOS', 'Vence', 'FORNECEDOR', 'STATUS', 'Contrato'] + \
+        [f'Unnamed: {i}' for i in range(6, 21)]
+    linhas = [
+        [None] * 21,
+        [None, 'Despesas de TI'] + [None] * 19,
+        [None, 'Serviço 1', 10, 'Fornecedor A', 'Em dia', None, None] + [10.0] * 12 + [None, 120.0],
+        [None, None, 5, 'Fornecedor B', None, None, None] + [1.0] * 12 + [None, 12.0],
+        [None, 'Serviço 2', 20, 'Fornecedor B', 'Vencido', None, None] + [0.015] + [np.nan] * 11 + [None, 0.015],
+    ]
+    return pd.DataFrame(linhas, columns=colunas)
+
+
+def test_normalizar_planilha():
+    df = normalizar_planilha(planilha_bruta())
+    assert df.columns.tolist() == ['TIPO DE SERVIÇOS', 'FORNECEDOR'] + COLUNAS_VALORES
+    # Linhas de apresentação e sem tipo de serviço saem
+    assert df['FORNECEDOR'].tolist() == ['Fornecedor A', 'Fornecedor B']
+    assert df['Total'].tolist() == [120.0, 0.015]
+
+
+def test_para_centavos():
+    centavos = para_centavos([1.23, -4.56, np.nan, 0.1 + 0.2])
+    assert centavos.dtype == np.int64
+    assert centavos.tolist() == [123, -456, 0, 30]
+
+
+def test_compactar_e_voltar_para_reais():
+    df = normalizar_planilha(planilha_bruta())
+    compacta = compactar(df)
+    assert isinstance(compacta['FORNECEDOR'].dtype, pd.CategoricalDtype)
+    assert (compacta[COLUNAS_VALORES].dtypes == np.int64).all()
+    assert colunas_em_centavos(compacta) == COLUNAS_VALORES
+    # A planilha original não muda e compactar de novo não faz nada
+    assert df['Total'].dtype == np.float64
+    assert compactar(compacta) is compacta
+
+    reais = valores_em_reais(compacta)
+    assert colunas_em_centavos(reais) == []
+    # Células vazias voltam como zero; o resto, ao centavo
+    esperado = df[COLUNAS_VALORES].fillna(0.0).round(2)
+    pd.testing.assert_frame_equal(reais[COLUNAS_VALORES], esperado)
+
+
+def test_marca_de_centavos_acompanha_fatias():
+    compacta = compactar(normalizar_planilha(planilha_bruta()))
+    assert colunas_em_centavos(compacta.iloc[[1]]) == COLUNAS_VALORES
+    assert colunas_em_centavos(compacta[['FORNECEDOR', 'Total']]) == ['Total']
+
+
+def test_coluna_inteira_sem_marca_fica_em_reais():
+    df = pd.DataFrame({'FORNECEDOR': ['A', 'B'], 'jan/25': [1, 2], 'Total': [1.5, 2.5]})
+    assert valores_em_reais(df) is df
+    assert compactar(df)['jan/25'].tolist() == [100, 200]
+
+
+def test_linhas_sem():
+    df = pd.DataFrame({'FORNECEDOR': ['A', 'B', None, 'C', 'A']})
+    esperado = [False, True, True, False, False]
+    assert linhas_sem(df, 'FORNECEDOR', ['A', 'C']).tolist() == esperado
+    # Na coluna categórica, a linha sem fornecedor também nunca é excluída
+    compacta = compactar(df)
+    assert linhas_sem(compacta, 'FORNECEDOR', ['A', 'C']).tolist() == esperado
+    assert linhas_sem(compacta, 'FORNECEDOR', []).all()
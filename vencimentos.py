@@ -0,0 +1,115 @@
+"""Datas de vencimento a partir do dia do mês ('Vence') das despesas.
+
+Cada contrato vence todo mês no dia da coluna 'Vence'. O próximo vencimento é
+esse dia no mês da data de referência ou, se ele já passou, no mês seguinte.
+Dias que o mês não tem (31 em abril, 30 em fevereiro) caem no último dia do
+mês. Tudo é calculado de uma vez em arrays datetime64 do numpy, sem criar um
+`datetime` por linha.
+
+A situação de cada despesa no mês (vencida, vence hoje, vence em breve, em
+dia) sai das mesmas comparações vetorizadas, e a cor de cada situação vem de
+um único mapeamento, aplicado à tabela inteira numa chamada só do Styler.
+Acima de `LIMITE_ESTILO` linhas, a tabela vai sem Styler (que formata célula
+por célula) e a situação aparece só como coluna com ícone.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+VENCIDO = 'Vencido'
+VENCE_HOJE = 'Vence hoje'
+VENCE_EM_BREVE = 'Vence em breve'
+EM_DIA = 'Em dia'
+SEM_VENCIMENTO = 'Sem vencimento'
+SITUACOES = [VENCIDO, VENCE_HOJE, VENCE_EM_BREVE, EM_DIA, SEM_VENCIMENTO]
+
+# Quantos dias antes do vencimento a despesa passa a "vence em breve"
+ANTECEDENCIA = 5
+
+ESTILOS = {
+    VENCIDO: 'background-color: red; color: white',
+    VENCE_HOJE: 'background-color: orange',
+    VENCE_EM_BREVE: 'background-color: #fff3cd',
+    EM_DIA: 'background-color: green; color: white',
+    SEM_VENCIMENTO: 'background-color: white',
+}
+ICONES = {VENCIDO: '🔴', VENCE_HOJE: '🟠', VENCE_EM_BREVE: '🟡', EM_DIA: '🟢', SEM_VENCIMENTO: '⚪'}
+
+# Acima disso, o Styler fica lento demais para desenhar a tabela
+LIMITE_ESTILO = 5_000
+
+
+def _dia_no_mes(meses, dias):
+    """Data do dia `dias` em cada mês de `meses` (datetime64[M]), limitada ao fim do mês."""
+    primeiro = meses.astype('datetime64[D]')
+    ultimo = (meses + 1).astype('datetime64[D]') - 1
+    return np.minimum(primeiro + (dias - 1), ultimo)
+
+
+def dias_validos(dias):
+    """Converte a coluna 'Vence' para dias inteiros de 1 a 31 (float, NaN onde não há dia válido).
+
+    Textos e valores fora do intervalo viram NaN; frações são truncadas, como o `int(dia)`.
+    """
+    dias = np.trunc(pd.to_numeric(pd.Series(dias), errors='coerce').to_numpy(dtype='float64', na_value=np.nan))
+    dias[~((dias >= 1) & (dias <= 31))] = np.nan
+    return dias
+
+
+def proximo_vencimento(dias, referencia=None):
+    """Próximo vencimento de cada dia do mês em `dias`, a partir de `referencia` (padrão: hoje).
+
+    O vencimento no próprio dia da referência ainda conta como não vencido. Devolve
+    uma Series datetime64 (NaT onde o dia é inválido), com o índice de `dias` quando
+    ele é uma Series.
+    """
+    referencia = pd.Timestamp.now() if referencia is None else pd.Timestamp(referencia)
+    dia_referencia = np.datetime64(referencia.date(), 'D')
+    mes = dia_referencia.astype('datetime64[M]')
+
+    numeros = dias_validos(dias)
+    validos = ~np.isnan(numeros)
+    inteiros = np.where(validos, numeros, 1).astype('int64')
+
+    vencimento = _dia_no_mes(mes, inteiros)
+    vencimento = np.where(vencimento < dia_referencia, _dia_no_mes(mes + 1, inteiros), vencimento)
+    vencimento = np.where(validos, vencimento, np.datetime64('NaT'))
+    indice = dias.index if isinstance(dias, pd.Series) else None
+    return pd.Series(vencimento.astype('datetime64[ns]'), index=indice, name='Data Vencimento')
+
+
+def classificar_vencimentos(dias, referencia=None, antecedencia=ANTECEDENCIA):
+    """Situação de cada despesa no mês de `referencia` (padrão: hoje), como Categorical.
+
+    Compara o dia 'Vence' deste mês (limitado ao fim do mês) com o dia da
+    referência: antes é vencido, no dia vence hoje, até `antecedencia` dias
+    depois vence em breve e, depois disso, está em dia.
+    """
+    referencia = pd.Timestamp.now() if referencia is None else pd.Timestamp(referencia)
+    dia_referencia = np.datetime64(referencia.date(), 'D')
+
+    numeros = dias_validos(dias)
+    validos = ~np.isnan(numeros)
+    inteiros = np.where(validos, numeros, 1).astype('int64')
+    faltam = (_dia_no_mes(dia_referencia.astype('datetime64[M]'), inteiros) - dia_referencia).astype('int64')
+
+    codigos = np.select([~validos, faltam < 0, faltam == 0, faltam <= antecedencia], [4, 0, 1, 2], default=3)
+    indice = dias.index if isinstance(dias, pd.Series) else None
+    return pd.Series(pd.Categorical.from_codes(codigos, SITUACOES), index=indice, name='Situação')
+
+
+def estilos_das_linhas(df, situacao):
+    """Estilos de todas as células para `Styler.apply(..., axis=None)`: a cor da situação em toda a linha."""
+    cores = np.array([ESTILOS[s] for s in SITUACOES], dtype=object)[situacao.cat.codes.to_numpy()]
+    return pd.DataFrame(np.broadcast_to(cores[:, None], df.shape), index=df.index, columns=df.columns)
+
+
+def mostrar_vencimentos(df, situacao, limite=LIMITE_ESTILO, **kwargs):
+    """Mostra a tabela com a coluna 'Situação'; colorida por linha até `limite` linhas."""
+    rotulos = situacao.cat.rename_categories([f'{ICONES[s]} {s}' for s in SITUACOES])
+    tabela = df.assign(**{'Situação': rotulos})
+    if len(tabela) > limite:
+        st.caption(f"{len(tabela)} linhas: cores desligadas acima de {limite} linhas; veja a coluna Situação.")
+        st.dataframe(tabela, **kwargs)
+    else:
+        st.dataframe(tabela.style.apply(estilos_das_linhas, situacao=situacao, axis=None), **kwargs)